@@ -1,8 +1,10 @@
+import abc
 import functools
 import itertools
 import math
+import multiprocessing
+import numpy as np
 import numpy.random as nprand
-import scipy.stats as spstats
 
 @functools.cache
 def ballot_number(first, length):
@@ -29,6 +31,253 @@ def ballot_index(swap_vector):
         total += ballot_number(vi, place)
     return total
 
+def subset_sums(weights):
+    """Sum of `weights` over every subset of their indexes.
+    
+    Parameters
+    ----------
+    weights: a sequence of n integers
+    
+    Returns
+    -------
+    An array of length 2^n whose element S is the sum of weights[i] for every
+    bit i set in S.
+    """
+    sums = np.zeros(1, dtype=np.int64)
+    for weight in weights:
+        sums = np.concatenate([sums, sums + weight])
+    return sums
+
+def prefix_set_optima(n, step_cost):
+    """Find every ranking of n items minimizing a cost that depends only on
+    prefix sets, using dynamic programming over subsets.
+    
+    A ranking's cost is the sum of step_cost(x, S) over its positions, where
+    x is the item at that position and S the set of items ranked above it.
+    The best cost of ranking each set of items first is found from the best
+    costs of its subsets, so only 2^n * n steps are evaluated rather than n!
+    rankings.
+    
+    Parameters
+    ----------
+    n: number of items, ranked as 0 to n - 1. Sets are bitmasks of items.
+    step_cost: function (x, S) returning an integer array of costs for an
+        array S of bitmasks, none of which contain x
+    
+    Returns
+    -------
+    A tuple (best cost, set of optimal rankings as tuples of items)
+    """
+    size = 1 << n
+    best = np.zeros(size, dtype=np.int64)
+    # Visit sets in order of size, so subsets are done first
+    popcount = subset_sums(np.ones(n, dtype=np.int64))
+    order = np.argsort(popcount, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(popcount, minlength=n + 1))])
+    for k in range(1, n + 1):
+        layer = order[bounds[k]:bounds[k + 1]]
+        layer_best = np.full(len(layer), np.iinfo(np.int64).max, dtype=np.int64)
+        for x in range(n):
+            has_x = (layer >> x) & 1 == 1
+            subsets = layer[has_x] ^ (1 << x)
+            layer_best[has_x] = np.minimum(
+                layer_best[has_x], best[subsets] + step_cost(x, subsets))
+        best[layer] = layer_best
+    
+    # Every optimal ranking ends with an item whose removal leaves an
+    # optimal ranking of the rest
+    @functools.cache
+    def optimal_rankings(ranked_set):
+        if ranked_set == 0:
+            return [()]
+        rankings = []
+        for x in range(n):
+            if not (ranked_set >> x) & 1:
+                continue
+            subset = ranked_set ^ (1 << x)
+            cost = best[subset] + step_cost(x, np.array([subset]))[0]
+            if cost == best[ranked_set]:
+                rankings += [ranking + (x,) for ranking in optimal_rankings(subset)]
+        return rankings
+    
+    return int(best[size - 1]), set(optimal_rankings(size - 1))
+
+def unrank_permutations(start, stop, n):
+    """Permutations of range(n) from their indexes in lexicographic order.
+    
+    Each index is decoded as a Lehmer code, whose kth digit chooses among
+    the items not yet placed. Index 0 is the identity, and indexes follow
+    the order of itertools.permutations(range(n)).
+    
+    Returns
+    -------
+    A (stop - start) x n array, one permutation per row.
+    """
+    index = np.arange(start, stop, dtype=np.int64)
+    available = np.ones((len(index), n), dtype=bool)
+    permutations = np.empty((len(index), n), dtype=np.int64)
+    rows = np.arange(len(index))
+    for k in range(n):
+        base = math.factorial(n - 1 - k)
+        digit, index = index // base, index % base
+        # Position of the (digit + 1)th available item
+        item = np.argmax(np.cumsum(available, axis=1) > digit[:, None], axis=1)
+        permutations[:, k] = item
+        available[rows, item] = False
+    return permutations
+
+def _score_chunk(task):
+    score, n, start, stop = task
+    rankings = unrank_permutations(start, stop, n)
+    totals = score(rankings)
+    best = totals.min()
+    return best, rankings[totals == best]
+
+def exhaustive_optima(score, n, processes=None, chunk_size=2**14):
+    """Find every ranking of n items minimizing a score, by scoring all n!.
+    
+    Rankings are split into chunks of consecutive lexicographic indexes,
+    which are unranked and scored in worker processes.
+    
+    Parameters
+    ----------
+    score: picklable function mapping an (m x n) array of rankings to an
+        array of m integer scores, such as a RankingScore
+    n: number of items, ranked as 0 to n - 1
+    processes: number of worker processes, defaults to all cores.
+        With processes=1 chunks are scored in the current process.
+    chunk_size: number of rankings scored at once
+    
+    Returns
+    -------
+    A tuple (best score, list of optimal rankings as tuples of items)
+    """
+    total = math.factorial(n)
+    tasks = [
+        (score, n, start, min(start + chunk_size, total))
+        for start in range(0, total, chunk_size)]
+    if processes == 1:
+        results = map(_score_chunk, tasks)
+        return _merge_optima(results)
+    with multiprocessing.Pool(processes) as pool:
+        return _merge_optima(pool.imap_unordered(_score_chunk, tasks))
+
+def _merge_optima(results):
+    best = None
+    optima = []
+    for chunk_best, rankings in results:
+        if best is None or chunk_best < best:
+            best = chunk_best
+            optima = []
+        if chunk_best == best:
+            optima += [tuple(ranking) for ranking in rankings.tolist()]
+    return int(best), sorted(optima)
+
+class RankingScore(abc.ABC):
+    """Total dissimilarity of rankings to a profile, scored in bulk.
+    
+    Subclasses implement dissimilarities(positions) for an array where
+    positions[k, u, i] is the rank that ranking k gives to the ith item of
+    ballot u, returning a (rankings x ballots) integer array.
+    
+    Parameters
+    ----------
+    ballots: (U x n) array listing the items of each distinct ballot in order
+    counts: number of each ballot in the profile
+    """
+    
+    def __init__(self, ballots, counts):
+        self.ballots = np.asarray(ballots, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.n = self.ballots.shape[1]
+    
+    def __call__(self, rankings):
+        rows = np.arange(len(rankings))[:, None]
+        # Small integers make comparisons cheaper
+        ranks = np.empty(rankings.shape, dtype=np.int8)
+        ranks[rows, rankings] = np.arange(self.n)
+        return self.dissimilarities(ranks[:, self.ballots]) @ self.counts
+    
+    @abc.abstractmethod
+    def dissimilarities(self, positions):
+        pass
+
+class KendallScore(RankingScore):
+    """Kendall tau distance: pairs of ballot items ranked in the opposite order."""
+    
+    def dissimilarities(self, positions):
+        discordant = np.zeros(positions.shape[:2], dtype=np.int64)
+        for i in range(self.n - 1):
+            discordant += (positions[..., i:i + 1] > positions[..., i + 1:]).sum(axis=-1)
+        return discordant
+
+class BallotScore(RankingScore):
+    """Ballot index of the forward swap vector, see Preference.ballot_dissimilarity.
+    
+    All ballots have the same length, so indexes share the normalization,
+    `highest`.
+    """
+    
+    def __init__(self, ballots, counts):
+        super(BallotScore, self).__init__(ballots, counts)
+        self.highest = ballot_number(1, self.n) - 1
+        # numbers[j, v] is ballot_number(v, place) at swap vector index j
+        self.numbers = np.array([
+            [ballot_number(v, self.n - 1 - j) for v in range(self.n + 1)]
+            for j in range(self.n - 1)], dtype=np.int64).reshape(-1, self.n + 1)
+    
+    def dissimilarities(self, positions):
+        swaps = np.zeros(positions.shape[:2] + (self.n - 1,), dtype=np.int8)
+        for i in range(self.n - 1):
+            # Ballot item i moves up past the later ballot items the ranking
+            # places above it, one swap at each index from i
+            moves = (positions[..., i + 1:] < positions[..., i:i + 1]).sum(axis=-1, dtype=np.int8)
+            swaps[..., i:] += np.arange(self.n - 1 - i, dtype=np.int8) < moves[..., None]
+        return self.numbers[np.arange(self.n - 1), swaps].sum(axis=-1)
+
+class CrossingScore(RankingScore):
+    """Crossing vector combined with its place values, see Preference.crossing_dissimilarity.
+    
+    All ballots have the same length, so values share the normalization,
+    `highest`.
+    """
+    
+    def __init__(self, ballots, counts):
+        super(CrossingScore, self).__init__(ballots, counts)
+        self.place_values, self.highest = crossing_place_values(self.n - 1)
+    
+    def dissimilarities(self, positions):
+        value = np.zeros(positions.shape[:2], dtype=np.int64)
+        for i in range(self.n - 1):
+            # Ballot's top i + 1 items outside the ranking's top i + 1
+            crossing = (positions[..., :i + 1] > i).sum(axis=-1)
+            value += self.place_values[i] * crossing
+        return value
+
+def crossing_place_values(l):
+    """Place values of the elements of crossing vectors of length `l`.
+    
+    Returns
+    -------
+    A tuple (place_values, highest_representable). The crossing
+    dissimilarity of a crossing vector v is
+    sum(place_values[i] * v[i]) / highest_representable.
+    """
+    # Create list of number of possible values for each index
+    index_max = [min(i + 1, l - i) for i in range(0, l)]
+    # Create list of place values
+    # This part is generic mixed-base numeral calculations
+    place_values = []
+    place_value = 0
+    highest_representable = 0
+    for i, max_i in enumerate(index_max):
+        place_value = highest_representable + 1
+        place_values.append(place_value)
+        highest_representable += place_value * max_i
+    # Reverse place values because low index means high rank
+    place_values = list(reversed(place_values))
+    return place_values, highest_representable
+
 class Preference(object):
     """
     Represents a rank-ordered preference.
@@ -237,20 +486,7 @@ class Preference(object):
     
     def crossing_dissimilarity (self, other):
         crossing_vector = self.crossing_vector(other)
-        l = len(crossing_vector)
-        # Create list of number of possible values for each index
-        index_max = [min(i + 1, l - i) for i in range(0, l)]
-        # Create list of place values
-        # This part is generic mixed-base numeral calculations
-        place_values = []
-        place_value = 0
-        highest_representable = 0
-        for i, max_i in enumerate(index_max):
-            place_value = highest_representable + 1
-            place_values.append(place_value)
-            highest_representable += place_value * max_i
-        # Reverse place values because low index means high rank
-        place_values = list(reversed(place_values))
+        place_values, highest_representable = crossing_place_values(len(crossing_vector))
         # Calculate the value by combining crossing vector and place values
         d = sum([place_values[i] * vi for i, vi in enumerate(crossing_vector)])
         return d / highest_representable
@@ -263,6 +499,8 @@ class Profile(object):
     
     def __init__ (self, preferences=None):
         self.preference_counts = {}
+        # Matrices between distinct preferences, see distance_matrix()
+        self._matrices = {}
         if preferences is not None:
             for pref in preferences:
                 self.add(pref)
@@ -271,6 +509,7 @@ class Profile(object):
         if preference.__class__ != Preference:
             preference = Preference(preference)
         self.preference_counts[preference] = self.preference_counts.get(preference, 0) + 1
+        self._matrices = {}
         
     def alternatives (self):
         preference_alternatives = [p.alternatives() for p in self.preference_counts.keys()]
@@ -342,65 +581,99 @@ class Profile(object):
             bootstrap.add(preferences[nprand.choice(count, p=p)])
         return bootstrap
             
+    def rank_matrix(self):
+        """Ranks given by each distinct preference, computed once.
+        
+        Returns
+        -------
+        A tuple (preferences, counts, ranks). preferences lists the distinct
+        preferences and counts their number of ballots. ranks is a (U x n)
+        array where ranks[u, i] is the rank preferences[u] gives to the ith
+        of sorted(self.alternatives()), as in Preference.ranks().
+        """
+        try:
+            return self._matrices['ranks']
+        except KeyError:
+            pass
+        n = len(self.alternatives())
+        preferences = list(self.preference_counts.keys())
+        if any(len(pref) != n for pref in preferences):
+            raise ValueError('Every preference must rank all alternatives')
+        counts = np.array([self.preference_counts[pref] for pref in preferences], dtype=np.int64)
+        ranks = np.array([pref.ranks() for pref in preferences], dtype=np.int64).reshape(-1, n)
+        self._matrices['ranks'] = (preferences, counts, ranks)
+        return self._matrices['ranks']
+    
+    def distance_matrix(self, metric):
+        """Compare every pair of distinct preferences, computed once per metric.
+        
+        Parameters
+        ----------
+        metric: one of
+            'spearman': Spearman rank correlation
+            'kendall': Kendall tau rank correlation
+            'ballot': a.ballot_dissimilarity(b) for row a and column b
+            'crossing': a.crossing_dissimilarity(b) for row a and column b
+        
+        Returns
+        -------
+        A (U x U) array, with rows and columns in the order of rank_matrix().
+        """
+        try:
+            return self._matrices[metric]
+        except KeyError:
+            pass
+        preferences, counts, ranks = self.rank_matrix()
+        n = ranks.shape[1]
+        if metric == 'spearman':
+            # Ranks have no ties, so the correlation follows from squared rank differences
+            squared = ((ranks[:, None, :] - ranks[None, :, :])**2).sum(axis=-1)
+            matrix = 1 - 6 * squared / (n * (n**2 - 1))
+        elif metric == 'kendall':
+            # Products of the signs of every pair's rank difference are
+            # 1 for concordant and -1 for discordant pairs
+            i, j = np.triu_indices(n, 1)
+            signs = np.sign(ranks[:, i] - ranks[:, j])
+            matrix = (signs @ signs.T) / len(i)
+        elif metric in ('ballot', 'crossing'):
+            # Score every preference as a ranking against every preference as a ballot
+            ballots = np.argsort(ranks, axis=1)
+            score_class = BallotScore if metric == 'ballot' else CrossingScore
+            score = score_class(ballots, counts)
+            matrix = score.dissimilarities(ranks[:, ballots]).T / score.highest
+        else:
+            raise ValueError('Unknown metric: {}'.format(metric))
+        self._matrices[metric] = matrix
+        return matrix
+    
+    def pair_mean(self, matrix):
+        """Mean of `matrix` over all pairs of ballots with different preferences.
+        
+        With the count vector c, this is c^T M c / c^T J c, where the
+        diagonals of M and of the all-ones matrix J are set to 0 to exclude
+        pairs of identical preferences.
+        """
+        preferences, counts, ranks = self.rank_matrix()
+        matrix = matrix.copy()
+        np.fill_diagonal(matrix, 0)
+        total = counts @ matrix @ counts
+        count = counts.sum()**2 - (counts**2).sum()
+        return float(total) / float(count)
+            
     def agreement_spearman(self):
-        total = 0
-        count = 0
-        for pref_a, count_a in self.counts():
-            for pref_b, count_b in self.counts():
-                if pref_a == pref_b:
-                    continue
-                r, p = spstats.spearmanr(pref_a.ranks(), pref_b.ranks())
-                total += count_a * count_b * r
-                count += count_a * count_b
-        return total / count
+        return self.pair_mean(self.distance_matrix('spearman'))
     
     def agreement_kendall(self):
-        total = 0
-        count = 0
-        for pref_a, count_a in self.counts():
-            for pref_b, count_b in self.counts():
-                if pref_a == pref_b:
-                    continue
-                r, p = spstats.kendalltau(pref_a.ranks(), pref_b.ranks())
-                total += count_a * count_b * r
-                count += count_a * count_b
-        return total / count
+        return self.pair_mean(self.distance_matrix('kendall'))
     
     def agreement_ballot(self):
-        total = 0
-        count = 0
-        for pref_a, count_a in self.counts():
-            for pref_b, count_b in self.counts():
-                if pref_a == pref_b:
-                    continue
-                r = 1 - 2 * pref_a.ballot_dissimilarity(pref_b)
-                total += count_a * count_b * r
-                count += count_a * count_b
-        return total / count
+        return 1 - 2 * self.pair_mean(self.distance_matrix('ballot'))
     
     def agreement_crossing(self):
-        total = 0
-        count = 0
-        for pref_a, count_a in self.counts():
-            for pref_b, count_b in self.counts():
-                if pref_a == pref_b:
-                    continue
-                r = 1 - 2 * pref_a.crossing_dissimilarity(pref_b)
-                total += count_a * count_b * r
-                count += count_a * count_b
-        return total / count
+        return 1 - 2 * self.pair_mean(self.distance_matrix('crossing'))
     
     def disagreement_crossing(self):
-        total = 0
-        count = 0
-        for pref_a, count_a in self.counts():
-            for pref_b, count_b in self.counts():
-                if pref_a == pref_b:
-                    continue
-                r = pref_a.crossing_dissimilarity(pref_b)
-                total += count_a * count_b * r
-                count += count_a * count_b
-        return total / count
+        return self.pair_mean(self.distance_matrix('crossing'))
     
     def mean_kendall_tau(self, preference):
         total = 0
@@ -503,6 +776,28 @@ class SocialWelfare(object):
         return margins
     
     
+    def pairwise_matrix (self):
+        """Count the ballots preferring each alternative to each other.
+        
+        Returns
+        -------
+        A tuple (alternatives, wins). alternatives is the sorted list of
+        alternatives, and wins an integer array where wins[i, j] is the
+        number of ballots ranking alternatives[i] above alternatives[j].
+        The margin of i over j is wins[i, j] - wins[j, i].
+        """
+        alternatives = sorted(self.profile.alternatives())
+        index = dict((alt, i) for i, alt in enumerate(alternatives))
+        wins = np.zeros((len(alternatives), len(alternatives)), dtype=np.int64)
+        for pref, count in self.profile.counts():
+            ranks = np.full(len(alternatives), -1)
+            ranks[[index[alt] for alt in pref]] = np.arange(len(pref))
+            ranked = ranks >= 0
+            above = (ranks[:, None] < ranks[None, :]) & ranked[:, None] & ranked[None, :]
+            wins += count * above
+        return alternatives, wins
+    
+    
 class Condorcet(SocialWelfare):
     """Social welfare utilities for the Condorcet method"""
     
@@ -543,70 +838,234 @@ class Condorcet(SocialWelfare):
         return result
 
     
-class KemenyYoung(SocialWelfare):
+class Median(SocialWelfare):
+    """
+    Base class for social welfare functions choosing the rankings with the
+    lowest total dissimilarity to the ballots in a profile.
     
-    def social_preference_set(self):
-        # Iterate through every possible ordering
+    Subclasses set `dissimilarity`, a function (ballot Preference, ranking)
+    -> number, and `ranking_score`, the RankingScore computing the same
+    dissimilarity in bulk.
+    """
+    
+    dissimilarity = None
+    ranking_score = None
+    
+    def scan_optima (self, rankings):
+        """Keep the rankings an exhaustive floating point scan would choose.
+        
+        Exact optima may have floating point totals differing in the last bit,
+        so only those with the lowest total, summed as the scan does, are kept.
+        
+        Parameters
+        ----------
+        rankings: exactly optimal rankings, as tuples of alternatives
+        
+        Returns
+        -------
+        A set of rankings.
+        """
         counts = self.profile.counts()
+        totals = [
+            sum([count * self.dissimilarity(p, pref) for p, count in counts])
+            for pref in rankings]
+        best = min(totals)
+        return set(pref for pref, total in zip(rankings, totals) if total == best)
+    
+    def exhaustive_preference_set (self, processes=None, chunk_size=2**14):
+        """Find all optimal rankings by scoring every permutation.
+        
+        Slower than social_preference_set(), but useful for validation.
+        Every ballot must rank all alternatives.
+        
+        Parameters
+        ----------
+        processes: number of worker processes, defaults to all cores
+        chunk_size: number of rankings scored at once
+        
+        Returns
+        -------
+        A set of tuples of alternatives, including all tied optima.
+        """
         alts = sorted(self.profile.alternatives())
-        preferences = itertools.permutations(alts)
-        best_total = None
-        best = set()
-        for pref in preferences:
-            tau_total = sum([
-                count * p.kendall_tau(pref)
-                for p, count in counts])
-            if best_total == None or tau_total < best_total:
-                best_total = tau_total
-                best = set()
-                best.add(pref)
-            elif tau_total == best_total:
-                best.add(pref)
-        return best
-        
-        
-class BallotMedian(SocialWelfare):
+        index = dict((alt, i) for i, alt in enumerate(alts))
+        counts = list(self.profile.counts())
+        if any(len(p) != len(alts) for p, count in counts):
+            raise ValueError('Exhaustive search requires ballots ranking every alternative')
+        ballots = [[index[alt] for alt in p] for p, count in counts]
+        score = self.ranking_score(ballots, [count for p, count in counts])
+        best, rankings = exhaustive_optima(score, len(alts), processes, chunk_size)
+        return self.scan_optima([tuple(alts[i] for i in ranking) for ranking in rankings])
+    
+    
+class KemenyYoung(Median):
+    
+    dissimilarity = staticmethod(Preference.kendall_tau)
+    ranking_score = KendallScore
     
     def social_preference_set(self):
-        # Iterate through every possible ordering
-        counts = self.profile.counts()
+        """Find all rankings minimizing the total Kendall tau distance to the profile.
+        
+        Placing x below a set S of alternatives disagrees with every ballot
+        ranking x above a member of S, so the distance decomposes over prefix
+        sets and is minimized exactly by prefix_set_optima().
+        
+        Returns
+        -------
+        A set of tuples of alternatives, including all tied optima.
+        """
+        alts, wins = self.pairwise_matrix()
+        # Cost of placing x below S: ballots preferring x to members of S
+        costs = [subset_sums(wins[x]) for x in range(len(alts))]
+        total, rankings = prefix_set_optima(
+            len(alts), lambda x, subsets: costs[x][subsets])
+        return set(tuple(alts[i] for i in ranking) for ranking in rankings)
+        
+        
+class BallotMedian(Median):
+    """Median rankings by ballot dissimilarity, found by branch and bound.
+    
+    Bubble sorting a ranking into a ballot moves each of the ballot's
+    alternatives up past the alternatives the ranking places above it and the
+    ballot below it. The ballot's swap vector counts these moves at each
+    position. Rankings are built top down. Once an alternative is placed, its
+    moves are known; every unplaced alternative moves at least past the
+    placed alternatives below it in the ballot. The ballot index grows with
+    the swap vector, so these counts give a lower bound on the dissimilarity
+    of every completion, and prefixes whose bound exceeds the best ranking
+    found so far are pruned.
+    
+    After social_preference_set(), search_stats gives the number of prefixes
+    visited ('nodes'), pruned ('pruned') and complete rankings reached
+    ('leaves').
+    """
+    
+    dissimilarity = staticmethod(Preference.ballot_dissimilarity)
+    ranking_score = BallotScore
+    
+    def social_preference_set(self):
+        """Find all rankings minimizing the total ballot dissimilarity to the profile.
+        
+        Returns
+        -------
+        A set of tuples of alternatives, including all tied optima.
+        """
+        # Single alternative ballots have no swap vector
+        counts = [(p, count) for p, count in self.profile.counts() if len(p) > 1]
         alts = sorted(self.profile.alternatives())
-        preferences = itertools.permutations(alts)
-        best_total = None
-        best = set()
-        for pref in preferences:
-            ws_total = sum([
-                count * p.ballot_dissimilarity(pref)
-                for p, count in counts])
-            if best_total == None or ws_total < best_total:
-                best_total = ws_total
-                best = set()
-                best.add(pref)
-            elif ws_total == best_total:
-                best.add(pref)
-        return best
-        
-
-class CrossingMedian(SocialWelfare):
+        index = dict((alt, i) for i, alt in enumerate(alts))
+        n = len(alts)
+        ranks = np.arange(n)
+        
+        # Ballot rank of each alternative, n if not ranked
+        positions = np.full((len(counts), n), n)
+        for u, (p, count) in enumerate(counts):
+            positions[u, [index[alt] for alt in p]] = np.arange(len(p))
+        # Dissimilarities as integers over a common denominator, so ties are exact
+        highest = [ballot_number(1, len(p)) - 1 for p, count in counts]
+        common = math.lcm(*highest)
+        weights = np.array([
+            count * (common // h) for (p, count), h in zip(counts, highest)], dtype=np.int64)
+        # numbers[u, j, v] is ballot_number(v, place) at swap vector index j
+        numbers = np.zeros((len(counts), n, n + 1), dtype=np.int64)
+        for u, (p, count) in enumerate(counts):
+            for j in range(len(p) - 1):
+                numbers[u, j] = [ballot_number(v, len(p) - 1 - j) for v in range(n + 1)]
+        # below[i, j]: moves of the alternative at ballot rank i can reach index j
+        below = ranks[:, None] <= ranks[None, :]
+        
+        def bounds(moves):
+            # Swap vector element j counts alternatives at ballot ranks i <= j
+            # moving past index j, (children x ballots x n) moves
+            crossing = (moves[..., :, None] + ranks[:, None] > ranks[None, :]) & below
+            swaps = crossing.sum(axis=-2)
+            terms = np.take_along_axis(numbers[None], swaps[..., None], axis=-1)[..., 0]
+            return terms.sum(axis=-1) @ weights
+        
+        stats = {'nodes': 0, 'pruned': 0, 'leaves': 0}
+        best = [None, []]
+        
+        def search(prefix, remaining, moves, placed):
+            stats['nodes'] += 1
+            if not remaining:
+                stats['leaves'] += 1
+                return
+            children = np.array(remaining)
+            # Placing x adds a move to every unplaced alternative the ballot
+            # ranks above x; alternatives already placed keep their moves
+            raised = (ranks[None, None, :] < positions.T[children][:, :, None]) & ~placed
+            child_moves = moves + raised
+            child_bounds = bounds(child_moves)
+            for c in np.argsort(child_bounds, kind='stable'):
+                bound = int(child_bounds[c])
+                if best[0] is not None and bound > best[0]:
+                    stats['pruned'] += 1
+                    continue
+                x = int(children[c])
+                child_placed = placed.copy()
+                ranked = positions[:, x] < n
+                child_placed[ranked, positions[ranked, x]] = True
+                child_remaining = [y for y in remaining if y != x]
+                if not child_remaining:
+                    # Bounds of complete rankings are exact
+                    if best[0] is None or bound < best[0]:
+                        best[0], best[1] = bound, []
+                    best[1].append(prefix + (x,))
+                search(prefix + (x,), child_remaining, child_moves[c], child_placed)
+        
+        search(
+            (), list(range(n)),
+            np.zeros((len(counts), n), dtype=np.int64),
+            np.zeros((len(counts), n), dtype=bool))
+        self.search_stats = stats
+        rankings = [tuple(alts[i] for i in ranking) for ranking in best[1]]
+        return self.scan_optima(rankings)
+        
+
+class CrossingMedian(Median):
+    
+    dissimilarity = staticmethod(Preference.crossing_dissimilarity)
+    ranking_score = CrossingScore
     
     def social_preference_set(self):
-        # Iterate through every possible ordering
+        """Find all rankings minimizing the total crossing dissimilarity to the profile.
+        
+        Element i of a ballot's crossing vector against a ranking counts the
+        ballot's top i + 1 alternatives missing from the ranking's top i + 1,
+        so the total dissimilarity is a sum over the ranking's prefix sets
+        and is minimized exactly by prefix_set_optima().
+        
+        Returns
+        -------
+        A set of tuples of alternatives, including all tied optima.
+        """
         counts = self.profile.counts()
         alts = sorted(self.profile.alternatives())
-        preferences = itertools.permutations(alts)
-        best_total = None
-        best = set()
-        for pref in preferences:
-            ws_total = sum([
-                count * p.crossing_dissimilarity(pref)
-                for p, count in counts])
-            if best_total == None or ws_total < best_total:
-                best_total = ws_total
-                best = set()
-                best.add(pref)
-            elif ws_total == best_total:
-                best.add(pref)
-        return best
+        index = dict((alt, i) for i, alt in enumerate(alts))
+        n = len(alts)
+        sets = np.arange(1 << n)
+        popcount = subset_sums(np.ones(n, dtype=np.int64))
+        layers = [sets[popcount == k] for k in range(n + 1)]
+        # Express every ballot's dissimilarity as an integer over a common
+        # denominator, so ties are exact
+        scales = dict(
+            (pref, crossing_place_values(len(pref) - 1))
+            for pref, count in counts if len(pref) > 1)
+        common = math.lcm(*[highest for place_values, highest in scales.values()])
+        # Cost of each prefix set, from the crossing vector elements it decides
+        cost = np.zeros(1 << n, dtype=np.int64)
+        for pref, (place_values, highest) in scales.items():
+            weight = self.profile.preference_counts[pref] * (common // highest)
+            top = 0
+            for i in range(len(pref) - 1):
+                top |= 1 << index[pref[i]]
+                layer = layers[i + 1]
+                crossing = i + 1 - popcount[layer & top]
+                cost[layer] += weight * place_values[i] * crossing
+        total, rankings = prefix_set_optima(
+            n, lambda x, subsets: cost[subsets | (1 << x)])
+        rankings = [tuple(alts[i] for i in ranking) for ranking in rankings]
+        return self.scan_optima(rankings)
         
         
 class Majority(SocialWelfare):
@@ -0,0 +1,92 @@
+import itertools
+import math
+
+import unittest
+
+import numpy as np
+
+from socialchoice import *
+
+ALTERNATIVES = ('a', 'b', 'c', 'd', 'e')
+
+def random_profile(seed, ballots=7, alternatives=ALTERNATIVES):
+    rng = np.random.RandomState(seed)
+    # Repeat some ballots, so counts are not all 1
+    preferences = [tuple(rng.permutation(alternatives)) for i in range(ballots - 2)]
+    return Profile(preferences + preferences[:2])
+
+class TestSocialChoice(unittest.TestCase):
+
+    def check_median(self, cls, seeds=range(6)):
+        for seed in seeds:
+            median = cls(random_profile(seed))
+            expected = median.exhaustive_preference_set(processes=1)
+            self.assertTrue(expected)
+            self.assertEqual(median.social_preference_set(), expected)
+
+    def test_kemeny_young(self):
+        self.check_median(KemenyYoung)
+
+    def test_crossing_median(self):
+        self.check_median(CrossingMedian)
+
+    def test_ballot_median(self):
+        self.check_median(BallotMedian)
+
+    def test_unrank_permutations(self):
+        for n in range(1, 6):
+            expected = list(itertools.permutations(range(n)))
+            rankings = unrank_permutations(0, math.factorial(n), n)
+            self.assertEqual([tuple(ranking) for ranking in rankings.tolist()], expected)
+        # Chunks start part way through the order
+        for n in range(4, 6):
+            expected = list(itertools.permutations(range(n)))
+            self.assertEqual(
+                [tuple(ranking) for ranking in unrank_permutations(3, 7, n).tolist()],
+                expected[3:7])
+
+    def test_exhaustive_optima(self):
+        profile = random_profile(0)
+        index = dict((alt, i) for i, alt in enumerate(ALTERNATIVES))
+        counts = list(profile.counts())
+        ballots = [[index[alt] for alt in p] for p, count in counts]
+        score = KendallScore(ballots, [count for p, count in counts])
+        # Scores of every ranking, one at a time
+        totals = dict(
+            (ranking, sum(count * p.kendall_tau(tuple(ALTERNATIVES[i] for i in ranking))
+                          for p, count in counts))
+            for ranking in itertools.permutations(range(len(ALTERNATIVES))))
+        best = min(totals.values())
+        expected = sorted(ranking for ranking, total in totals.items() if total == best)
+        # Small chunks split the rankings between several tasks
+        self.assertEqual(
+            exhaustive_optima(score, len(ALTERNATIVES), processes=1, chunk_size=7),
+            (best, expected))
+
+    def test_ranking_score_abstract(self):
+        with self.assertRaises(TypeError):
+            RankingScore([[0, 1]], [1])
+
+    def test_distance_matrix(self):
+        profile = random_profile(1)
+        preferences, counts, ranks = profile.rank_matrix()
+        n = len(ALTERNATIVES)
+        metrics = {
+            'spearman': lambda a, b: 1 - 6 * sum(
+                (x - y)**2 for x, y in zip(a.ranks(), b.ranks())) / (n * (n**2 - 1)),
+            'kendall': lambda a, b: 1 - 2 * a.kendall_tau(b, normalize=True),
+            'ballot': lambda a, b: a.ballot_dissimilarity(b),
+            'crossing': lambda a, b: a.crossing_dissimilarity(b),
+        }
+        ballots = [p for p, count in profile.counts() for k in range(count)]
+        for metric, distance in metrics.items():
+            matrix = profile.distance_matrix(metric)
+            expected = [[distance(a, b) for b in preferences] for a in preferences]
+            self.assertTrue(np.allclose(matrix, expected), metric)
+            # Mean over ordered pairs of ballots with different preferences
+            pairs = [distance(a, b) for a in ballots for b in ballots if a is not b]
+            self.assertAlmostEqual(profile.pair_mean(matrix), np.mean(pairs))
+
+
+if __name__ == '__main__':
+    unittest.main()
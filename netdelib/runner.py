@@ -0,0 +1,254 @@
+"""Run simulation trials in parallel from an ini configuration.
+
+The configuration uses the same [abm], [networks] and [strategies] sections
+as the simulation notebooks, e.g. simulation2/soclearn.ini.sample.
+
+Each trial is seeded from its own numpy SeedSequence, spawned from a single
+sweep seed, so results do not depend on the number of worker processes.
+
+Example
+    config = runner.read_config('soclearn.ini')
+    for run, result in runner.run_trials(config, seed=42):
+        ...
+"""
+import configparser
+import multiprocessing
+
+import numpy as np
+
+from .soclearn import batch as slbatch
+from .soclearn import evaluate as sleval
+from .soclearn import MODE_ALL
+from .soclearn import shared as slshared
+from .soclearn import strategy as slstrat
+from .soclearn.discrete import run_discrete
+from .soclearn.models import generated as slgen
+from .topologies import factories
+from .topologies.pool import GraphPool
+
+
+all_learning_strategies = {
+    'Best Neighbor': slstrat.best_neighbor,
+    'Confident Neighbor': slstrat.confident_neighbor,
+    'Conform': slstrat.conform,
+    'Local Majority': slstrat.local_majority,
+    'Random Neighbor Bit': slstrat.random_neighbor_bit,
+    'Random Neighbor List': slstrat.random_neighbor_list,
+}
+
+def _create_network(title, config):
+    N = config.getint('abm', 'N')
+    M = config.getint('abm', 'M')
+    networks = config['networks']
+    if title == 'Complete':
+        return factories.CompleteFactory(N, M)
+    if title == 'Lattice':
+        return factories.SmallWorldFactory(
+            N, M, networks.getint('small_world_k'), 0)
+    if title == 'Pref. Attach.':
+        return factories.PreferentialFactory(
+            N, M, networks.getint('barabasi_albert_m'))
+    if title == 'Small World':
+        return factories.SmallWorldFactory(
+            N, M, networks.getint('small_world_k'), networks.getfloat('small_world_a'))
+    if title == 'Long Path':
+        return factories.LongPathFactory(N, M)
+    if title == 'Random Group':
+        return factories.RandomGroupFactory(N, M)
+    if title == 'Random':
+        return factories.RandomFactory(N, M, networks.getfloat('erdos_renyi_p'))
+    if title == 'Stochastic Block':
+        return factories.StochasticBlockFactory(N, M)
+    if title == 'LFR':
+        return factories.LFRFactory(
+            N, M, networks.getfloat('lfr_tau1'), networks.getfloat('lfr_tau2'),
+            networks.getfloat('lfr_mu'))
+    raise ValueError('Unknown network: {}'.format(title))
+
+def read_config(path):
+    """Read an ini configuration file."""
+    config = configparser.ConfigParser()
+    config.read(path)
+    return config
+
+def create_pools(config):
+    """Create graph pools for the networks listed in [networks] pooled.
+
+    Pools hold [networks] pool_size graphs each, stored in [networks] pool_dir
+    and generated from [networks] pool_seed.
+
+    Returns
+    A dict mapping network titles to topologies.pool.GraphPool instances.
+    """
+    networks = config['networks']
+    titles = networks.get('pooled', fallback='')
+    pools = {}
+    for title in filter(None, titles.split(',')):
+        pools[title] = GraphPool(
+            _create_network(title, config),
+            networks.getint('pool_size'),
+            networks.get('pool_dir', fallback='pools'),
+            seed=networks.getint('pool_seed', fallback=0))
+    return pools
+
+def create_networks(config, run=None):
+    """Create the network factories enabled in config.
+
+    Parameters
+    run: (optional) index of the run. Networks with a graph pool, see
+        create_pools(), then use the pooled graph of the run. Pool files
+        are read once per process.
+
+    Returns
+    A list of (title, factory) tuples.
+    """
+    titles = config.get('networks', 'enabled').split(',')
+    pools = create_pools(config) if run is not None else {}
+    return [
+        (title, pools[title].factory(run) if title in pools else _create_network(title, config))
+        for title in titles]
+
+def create_strategies(config):
+    """Find the learning strategies enabled in config.
+
+    Returns
+    A list of (title, learning strategy) tuples.
+    """
+    titles = config.get('strategies', 'enabled').split(',')
+    return [(title, all_learning_strategies[title]) for title in titles]
+
+def learning_options(config):
+    """Find keyword arguments for run_discrete from the [strategies] section."""
+    strategies = config['strategies']
+    return {
+        'individual': strategies.getboolean('individual', fallback=False),
+        'individual_all_bits': strategies.getboolean('individual_all_bits', fallback=True),
+        'individual_mode': strategies.getint('individual_mode', fallback=MODE_ALL),
+        'critical': strategies.getboolean('critical', fallback=False),
+        'sample': strategies.getint('sample', fallback=None),
+    }
+
+def generated_trial(run, config):
+    """Run every strategy and network on one set of noisy initial beliefs.
+
+    The objective counts bits matching a true value of all 1s, as in
+    simulation/discrete_generated.ipynb.
+
+    Returns
+    A dict mapping (strategy title, network title) to a dict with the
+    fraction of correct agents ('correct') and mean belief distance
+    ('distance') at each step.
+    """
+    N = config.getint('abm', 'N')
+    M = config.getint('abm', 'M')
+    stages = config.getint('abm', 'stages')
+    steps = config.getint('abm', 'steps')
+    bit_count = config.getint('abm', 'bit_count')
+    p_error = config.getfloat('abm', 'p_error')
+
+    true_value = tuple([1 for bit in range(bit_count)])
+    objective = lambda belief: sum([
+        1 for index, true_bit in enumerate(true_value)
+        if belief[index] == true_bit])
+    initial_beliefs = slgen.initial_beliefs_noisy(N, true_value, p_error=p_error)
+    options = learning_options(config)
+
+    # Factories are shared by all strategies, so pooled graphs are only
+    # looked up once per trial
+    networks = create_networks(config, run)
+    result = {}
+    for title, learning_strategy in create_strategies(config):
+        for title2, factory in networks:
+            # Only per-step metrics are kept, not belief histories
+            correct = sleval.BeliefsCorrect(true_value)
+            distance = sleval.BeliefDistance(true_value)
+            run_discrete(
+                factory, learning_strategy, initial_beliefs, objective,
+                N, M, stages, steps, reducers=[correct, distance], history=(),
+                **options)
+            result[(title, title2)] = {
+                'correct': correct.values,
+                'distance': distance.values,
+            }
+    return result
+
+seed_trial = slbatch.seed_random
+
+def _run_task(task):
+    trial, run, seed_sequence, config_dict, handles = task
+    config = configparser.ConfigParser()
+    config.read_dict(config_dict)
+    seed_trial(seed_sequence)
+    if handles is None:
+        return run, trial(run, config)
+    return run, trial(run, config, slshared.attach(handles))
+
+def run_trials(
+    config, trial=generated_trial, runs=None, processes=None, chunksize=None, seed=None,
+    shared=None
+):
+    """Run trials over a process pool, yielding results as they complete.
+
+    Parameters
+    config: a ConfigParser, or path to an ini file
+    trial: function (run, config) -> result, must be picklable (defined at
+        module level). Defaults to generated_trial. If shared is given, the
+        trial is called as trial(run, config, shared objects).
+    runs: number of trials, defaults to [abm] runs
+    processes: number of worker processes, defaults to all cores.
+        With processes=1 trials run in the current process.
+    chunksize: number of trials sent to a worker at once
+    seed: seed for the whole sweep, trial i is seeded with the ith
+        SeedSequence spawned from it
+    shared: (optional) dict mapping names to large read-only values,
+        NumPy arrays, Landscapes or Adjacencies, such as initial belief
+        matrices. They are published once in shared memory and each trial
+        receives a dict of views of them, see soclearn.shared. The memory is
+        released when the sweep ends.
+
+    Graph pools from create_pools() are generated, if not already stored,
+    before any trial runs.
+
+    Yields
+    (run, result) tuples, in order of completion.
+    """
+    if isinstance(config, str):
+        config = read_config(config)
+    if runs is None:
+        runs = config.getint('abm', 'runs')
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if chunksize is None:
+        chunksize = max(1, runs // (4 * processes))
+
+    for pool in create_pools(config).values():
+        pool.generate(processes)
+
+    config_dict = dict((s, dict(config[s])) for s in config.sections())
+    seeds = np.random.SeedSequence(seed).spawn(runs)
+
+    with slshared.SharedArrays() as arrays:
+        handles = None
+        if shared is not None:
+            for name, value in shared.items():
+                arrays.publish(name, value)
+            handles = arrays.handles()
+        tasks = (
+            (trial, run, seeds[run], config_dict, handles)
+            for run in range(runs))
+
+        if processes == 1:
+            try:
+                for task in tasks:
+                    yield _run_task(task)
+            finally:
+                slshared.detach()
+            return
+        with multiprocessing.Pool(processes) as pool:
+            for run, result in pool.imap_unordered(_run_task, tasks, chunksize):
+                yield run, result
+
+def collect_trials(config, trial=generated_trial, **kwargs):
+    """Run trials with run_trials() and return a list of results ordered by run."""
+    results = dict(run_trials(config, trial, **kwargs))
+    return [results[run] for run in sorted(results)]
@@ -0,0 +1,226 @@
+import numpy as np
+from numpy import random as nprand
+
+
+class Adjacency(object):
+    """Graph adjacency in compressed sparse row (CSR) form.
+
+    The neighbors of row i are `indices[indptr[i]:indptr[i + 1]]`. Rows are
+    numbered by position in `nodes`. An Adjacency also provides `nodes()` and
+    `neighbors(v)`, so it can be used in place of a networkx Graph.
+
+    Constructor parameters
+    indptr: (N + 1) array of row offsets into indices
+    indices: array of neighbor rows
+    nodes: (optional) list of node labels, defaults to range(N)
+    """
+
+    def __init__(self, indptr, indices, nodes=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        if nodes is None:
+            nodes = list(range(len(self.indptr) - 1))
+        self.node_list = nodes
+        self._index = None
+        self._edge_rows = None
+        # Group ids if the graph is a disjoint union of cliques, see from_groups
+        self.groups = None
+
+    @classmethod
+    def from_graph(cls, G, nodes=None):
+        """Create an Adjacency from a networkx Graph.
+
+        # Params
+        G: a Graph
+        nodes: (optional) order of rows, defaults to the order of G.nodes().
+            Nodes missing from G have no neighbors.
+
+        # Return value
+        A new Adjacency.
+        """
+        if isinstance(G, Adjacency):
+            if nodes is None or nodes == G.node_list:
+                return G
+            G = G.to_graph()
+        if nodes is None:
+            nodes = list(G.nodes())
+        index = dict((v, i) for i, v in enumerate(nodes))
+        edges = np.array(
+            [(index[u], index[v]) for u, v in G.edges()],
+            dtype=np.int64).reshape(-1, 2)
+        # Each undirected edge appears in both rows, except self-loops
+        loops = edges[:, 0] == edges[:, 1]
+        rows = np.concatenate([edges[:, 0], edges[~loops, 1]])
+        cols = np.concatenate([edges[:, 1], edges[~loops, 0]])
+        return cls.from_edges(rows, cols, nodes)
+
+    @classmethod
+    def from_groups(cls, groups, nodes=None):
+        """Create an Adjacency for a disjoint union of cliques.
+
+        # Params
+        groups: (N,) array of group ids, rows with the same id form a clique
+        nodes: (optional) list of node labels, defaults to range(N)
+
+        # Return value
+        A new Adjacency, with the group ids stored as its `groups` attribute.
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        num_nodes = len(groups)
+        # Rows sorted by group, and the start of each group in that order
+        order = np.argsort(groups, kind='stable')
+        sizes = np.bincount(groups)
+        starts = np.cumsum(sizes) - sizes
+        # Each row lists every member of its group, then drops itself
+        row_sizes = sizes[groups]
+        rows = np.repeat(np.arange(num_nodes), row_sizes)
+        row_starts = np.cumsum(row_sizes) - row_sizes
+        offsets = np.arange(len(rows)) - np.repeat(row_starts, row_sizes)
+        members = order[starts[groups[rows]] + offsets]
+        indptr = np.concatenate([[0], np.cumsum(row_sizes - 1)])
+        adjacency = cls(indptr, members[members != rows], nodes)
+        adjacency.groups = groups
+        return adjacency
+
+    @classmethod
+    def from_edges(cls, rows, cols, nodes):
+        """Create an Adjacency from arrays of directed (row, col) pairs."""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        # Sorting a single key is much faster than np.lexsort
+        order = np.argsort(rows * len(nodes) + cols, kind='stable')
+        counts = np.bincount(rows, minlength=len(nodes))
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        return cls(indptr, cols[order], nodes)
+
+    def to_graph(self):
+        """Return the adjacency as a networkx Graph."""
+        import networkx as nx
+        G = nx.Graph()
+        G.add_nodes_from(self.node_list)
+        rows = self.edge_rows()
+        G.add_edges_from(
+            (self.node_list[r], self.node_list[c])
+            for r, c in zip(rows.tolist(), self.indices.tolist()))
+        return G
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    def degree(self):
+        """Return an array with the number of neighbors of each row."""
+        return np.diff(self.indptr)
+
+    def edge_rows(self):
+        """Return the row of each entry in indices."""
+        if self._edge_rows is None:
+            self._edge_rows = np.repeat(
+                np.arange(self.num_nodes), self.degree())
+        return self._edge_rows
+
+    def row_entries(self, rows):
+        """Find the neighbors of several rows.
+
+        # Params
+        rows: array of rows
+
+        # Return value
+        A tuple (entry_rows, neighbors) with one element per neighbor of the
+        given rows, entry_rows giving the position in rows it belongs to.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.indptr[rows]
+        counts = self.indptr[rows + 1] - starts
+        entry_rows = np.repeat(np.arange(len(rows)), counts)
+        offsets = np.arange(len(entry_rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return entry_rows, self.indices[np.repeat(starts, counts) + offsets]
+
+    def neighborhood(self, rows):
+        """Extract the neighborhoods of several rows.
+
+        # Params
+        rows: sorted array of rows
+
+        # Return value
+        A tuple (support, sub). support is the sorted array of the rows and
+        their neighbors, and sub an Adjacency over the nodes of support in
+        which only the given rows have neighbors. Work is proportional to
+        the number of neighbors of rows.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        entry_rows, neighbors = self.row_entries(rows)
+        support = np.union1d(rows, neighbors)
+        nodes = [self.node_list[i] for i in support.tolist()]
+        sub = Adjacency.from_edges(
+            np.searchsorted(support, rows[entry_rows]),
+            np.searchsorted(support, neighbors),
+            nodes)
+        return support, sub
+
+    def nodes(self):
+        return self.node_list
+
+    def neighbors(self, v):
+        if self._index is None:
+            self._index = dict((w, i) for i, w in enumerate(self.node_list))
+        i = self._index[v]
+        row = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        return [self.node_list[j] for j in row.tolist()]
+
+    def _sample_order(self, k, rng):
+        """Order each row's entries randomly.
+
+        # Return value
+        A tuple (order, rank, keep): entries of indices in random order
+        within each row, the position of each ordered entry within its row,
+        and whether that position is below k.
+        """
+        if rng is None:
+            rng = nprand
+        rows = self.edge_rows()
+        # Batches of replicates draw each replicate's keys from its own
+        # generator, see soclearn.batch.BatchGenerator
+        random_entries = getattr(rng, 'random_entries', None)
+        if random_entries is not None:
+            keys = random_entries(self)
+        else:
+            keys = rng.random(len(self.indices))
+        # Sort entries by row, then by random keys within the row. Keys are
+        # kept separate from rows, which could absorb them when rounded.
+        order = np.lexsort((keys, rows))
+        rank = np.arange(len(order)) - self.indptr[rows]
+        return order, rank, rank < k
+
+    def sample(self, k, rng=None):
+        """Randomly keep at most k neighbors of each row.
+
+        # Params
+        k: maximum number of neighbors per row
+        rng: (optional) source of random numbers, defaults to numpy.random
+
+        # Return value
+        A new Adjacency, or self if no row has more than k neighbors.
+        """
+        degree = self.degree()
+        if k is None or degree.max(initial=0) <= k:
+            return self
+        order, rank, keep = self._sample_order(k, rng)
+        indptr = np.concatenate([[0], np.cumsum(np.minimum(degree, k))])
+        return Adjacency(indptr, self.indices[order[keep]], self.node_list)
+
+    def sample_matrix(self, k, rng=None):
+        """Randomly choose at most k neighbors of each row, for all rows at once.
+
+        # Params
+        k: maximum number of neighbors per row
+        rng: (optional) source of random numbers, defaults to numpy.random
+
+        # Return value
+        An (N x k) array of neighbor rows, in random order. Rows with fewer
+        than k neighbors list all of them, padded with -1.
+        """
+        matrix = np.full((self.num_nodes, k), -1, dtype=np.int64)
+        order, rank, keep = self._sample_order(k, rng)
+        matrix[self.edge_rows()[keep], rank[keep]] = self.indices[order[keep]]
+        return matrix
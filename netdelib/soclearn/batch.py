@@ -0,0 +1,200 @@
+"""Run several independent replicates of a simulation as one population.
+
+The replicates share N, the number of bits, the learning strategy and the
+objective. Their beliefs are stacked into a single (runs * agents x bits)
+matrix and their graphs into a single block-diagonal Adjacency, so each
+learning step is applied once per batch rather than once per replicate.
+
+Each replicate has its own SeedSequence, spawned from the batch seed, for
+its graphs and for a generator used by its learning steps. Vectorized
+strategies draw random numbers for the whole stacked population at once,
+made of one block per replicate drawn from that replicate's generator (see
+BatchGenerator), so a replicate's outcome only depends on the batch seed
+and its position in the batch, not on the other replicates. Dict-based
+strategies draw from the global random modules, so run_batch only accepts
+vectorized ones.
+
+Example
+    correct = sleval.BeliefsCorrect(true_value)
+    result = batch.run_batch(
+        factory, slvec.conform, initial_beliefs, objective, N, M,
+        stages, steps, reducers=[correct], seed=42)
+    result.metrics[0]  # runs x (stages * steps + 1)
+"""
+import random
+
+import numpy as np
+from numpy import random as nprand
+
+from .adjacency import Adjacency
+from .learn import MODE_ALL, _learning_step
+from . import vectorized as slvec
+from .state import BeliefState
+
+
+def seed_random(seed_sequence):
+    """Seed the random and numpy.random modules from a numpy SeedSequence."""
+    random.seed(int(seed_sequence.generate_state(1, np.uint64)[0]))
+    nprand.seed(seed_sequence.generate_state(4))
+
+def stack_adjacencies(adjacencies):
+    """Combine several adjacencies into one block-diagonal Adjacency.
+
+    Rows of the ith adjacency follow those of the previous ones. If every
+    adjacency has group ids, the result does too, with groups renumbered so
+    that replicates do not share groups.
+
+    # Return value
+    A new Adjacency with nodes numbered 0 to the total number of rows.
+    """
+    node_offsets = np.cumsum([0] + [a.num_nodes for a in adjacencies])
+    entry_offsets = np.cumsum([0] + [len(a.indices) for a in adjacencies])
+    indptr = np.concatenate([[0]] + [
+        a.indptr[1:] + offset for a, offset in zip(adjacencies, entry_offsets)])
+    indices = np.concatenate([np.zeros(0, dtype=np.int64)] + [
+        a.indices + offset for a, offset in zip(adjacencies, node_offsets)])
+    stacked = Adjacency(indptr, indices)
+    if all(a.groups is not None for a in adjacencies):
+        group_offsets = np.cumsum([0] + [a.groups.max(initial=-1) + 1 for a in adjacencies])
+        stacked.groups = np.concatenate([np.zeros(0, dtype=np.int64)] + [
+            a.groups + offset for a, offset in zip(adjacencies, group_offsets)])
+    return stacked
+
+class BatchGenerator(object):
+    """Random numbers for stacked replicates, one generator per replicate.
+
+    Draws are made of one block per replicate, taken from its own generator.
+    Strategies from soclearn.vectorized draw one value per row, or per
+    adjacency entry when sampling neighbors (see random_entries()).
+
+    Constructor parameters
+    generators: list of numpy Generators, one per replicate
+    block_size: number of rows of each replicate
+    """
+
+    def __init__(self, generators, block_size):
+        self.generators = generators
+        self.block_size = block_size
+
+    def random(self, size):
+        """Draw floats in [0, 1), with the first dimension of size over all rows."""
+        shape = (size,) if np.isscalar(size) else tuple(size)
+        if shape[0] != len(self.generators) * self.block_size:
+            raise ValueError('Expected one draw per row, got {}'.format(shape[0]))
+        block = (self.block_size,) + shape[1:]
+        return np.concatenate([g.random(block) for g in self.generators])
+
+    def random_entries(self, adjacency):
+        """Draw one float in [0, 1) per entry of a stacked adjacency."""
+        bounds = adjacency.indptr[::self.block_size]
+        return np.concatenate([
+            g.random(end - start)
+            for g, start, end in zip(self.generators, bounds[:-1], bounds[1:])])
+
+class BatchResult(object):
+    """Outcome of a batch of replicates.
+
+    Attributes
+    final: (runs x agents x bits) array of beliefs after the last step
+    metrics: list with a (runs x steps) array for each reducer, in order,
+        including the initial beliefs as step 0
+    """
+
+    def __init__(self, final, metrics):
+        self.final = final
+        self.metrics = metrics
+
+    @property
+    def runs(self):
+        return len(self.final)
+
+def run_batch(
+    factory,
+    learning_strategy,
+    initial_beliefs,
+    objective,
+    N,
+    M,
+    stages,
+    steps,
+    individual=False,
+    individual_all_bits=True,
+    individual_mode=MODE_ALL,
+    critical=False,
+    sample=None,
+    reducers=None,
+    seed=None
+):
+    """Run independent replicates of run_discrete together.
+
+    Parameters:
+    factory: network factory, each replicate creates its own graphs
+    learning_strategy: learning strategy from soclearn.vectorized
+    initial_beliefs: list of belief dicts for nodes 0 to N - 1, or a
+        (runs x N x bits) array, one per replicate
+    objective: objective function shared by all replicates
+    stages: the number of stages in each replicate
+    steps: the number of learning steps per stage
+    individual, individual_all_bits, individual_mode, critical, sample:
+        as for soclearn.learn
+    reducers: list of soclearn.evaluate.Reducer instances, evaluated for
+        all replicates at every step with reduce_batch()
+    seed: seed for the whole batch, replicate i is seeded with the ith
+        SeedSequence spawned from it
+
+    Returns
+    A BatchResult
+    """
+    if not getattr(learning_strategy, 'vectorized', False):
+        raise ValueError('run_batch requires a vectorized learning strategy, got {}'.format(
+            getattr(learning_strategy, '__name__', learning_strategy)))
+    nodes = list(range(N))
+    if isinstance(initial_beliefs, np.ndarray):
+        beliefs = initial_beliefs.astype(np.uint8)
+    else:
+        beliefs = np.stack([
+            BeliefState.from_dict(b, nodes).matrix for b in initial_beliefs])
+    runs, num_agents, num_bits = beliefs.shape
+    if reducers is None:
+        reducers = []
+
+    # Each replicate seeds its graphs and its learning steps separately
+    seeds = [s.spawn(2) for s in np.random.SeedSequence(seed).spawn(runs)]
+    graph_seeds = [graph_seed for graph_seed, step_seed in seeds]
+    rng = BatchGenerator(
+        [np.random.default_rng(step_seed) for graph_seed, step_seed in seeds],
+        num_agents)
+
+    individual_step = None
+    if individual:
+        if individual_all_bits:
+            individual_step = slvec.individual
+        else:
+            individual_step = slvec.individual_bit
+
+    metrics = [[reducer.reduce_batch(beliefs)] for reducer in reducers]
+    current = BeliefState(beliefs.reshape(-1, num_bits), list(range(runs * num_agents)))
+    for stage in range(stages):
+        # At later stages, only create new networks if factory.stage_graphs is True
+        if stage == 0 or factory.stage_graphs:
+            adjacencies = []
+            for graph_seed in graph_seeds:
+                seed_random(graph_seed.spawn(1)[0])
+                adjacencies.append(Adjacency.from_graph(factory.create_adjacency(stage), nodes))
+            adjacency = stack_adjacencies(adjacencies)
+
+        for i in range(steps):
+            individual_beliefs, social_beliefs, current = _learning_step(
+                learning_strategy, adjacency, adjacency, current,
+                individual_step=individual_step,
+                individual_mode=individual_mode,
+                critical=critical,
+                objective=objective,
+                sample=sample,
+                rng=rng)
+            beliefs = current.matrix.reshape(runs, num_agents, num_bits)
+            for reducer, values in zip(reducers, metrics):
+                values.append(reducer.reduce_batch(beliefs))
+
+    metrics = [np.stack(values, axis=1) for values in metrics]
+    return BatchResult(current.matrix.reshape(runs, num_agents, num_bits), metrics)
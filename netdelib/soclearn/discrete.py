@@ -0,0 +1,115 @@
+from .learn import learn, MODE_ALL
+from .result import RunResult
+
+def run_discrete(
+    factory,
+    learning_strategy,
+    initial_beliefs,
+    objective,
+    N,
+    M,
+    stages,
+    steps,
+    individual=False,
+    individual_all_bits=True,
+    individual_mode=MODE_ALL,
+    critical=False,
+    sample=None,
+    reducers=None,
+    history=None,
+    path=None,
+    stop_at_fixed_point=True
+):
+    """Run a single simulation.
+    
+    Parameters:
+    factory: network factory
+    learning strategy: learning strategy to simulate in topology
+    intial beliefs: dict of initial beliefs for each agent
+    objective: objective function to be maximized 
+    stages: the number of stages in each trial
+    steps: the number of learning steps per stage
+    individual: whether to perform individual learning before each stage
+    individaul_all_bits: If True (default), apply individual learning to each
+        bit of a solution, one bit at a time. Otherwise, chose a single bit at
+        random.
+    critical: If True, only keep social solutions that improve objective
+    sample: The number of neighbors to sample
+    reducers: list of online metrics updated at each step, see soclearn.learn
+    history: which histories to keep in the result, see soclearn.learn
+    path: (optional) trajectory directory, histories are written to disk
+        stage by stage instead of being kept in memory, see RunResult.save
+    stop_at_fixed_point: If True (default), stop early once beliefs reach a
+        fixed point, see soclearn.learn. If the graph is not regenerated,
+        all remaining stages are then filled in at once.
+    
+    Returns
+    A soclearn.result.RunResult, with `converged` the step (counted over
+    all stages) from which beliefs no longer changed, or None.
+    """
+    # Vectorized strategies, and neighbor sampling, take adjacency arrays,
+    # which factories can build without networkx. Pooled factories hand out
+    # the same Adjacency, which learn() then uses without converting it.
+    if getattr(learning_strategy, 'vectorized', False) or sample is not None:
+        create = factory.create_adjacency
+    else:
+        create = factory.create
+
+    result = None
+    converged = None
+    stage = 0
+    while stage < stages:
+        stage_steps = steps
+        if stage == 0:
+            # Create new network and initial beliefs at stage 0
+            G = create(stage)
+            stage_initial = initial_beliefs
+        else:
+            stage_initial = result.final
+            # At later stages, only create new network if factory.stage_graphs is True
+            if factory.stage_graphs:
+                G = create(stage)
+            elif converged is not None:
+                # Beliefs are fixed on this graph, run the remaining stages
+                # together, which stops after one step
+                stage_steps = steps * (stages - stage)
+
+        # Run several learning steps and add beliefs at each step to beliefs_stages
+        # The first element of the result is just the initial belief, which is already in beliefs_stages
+        step_result = learn(
+            G,
+            stage_initial,
+            learning_strategy,
+            objective,
+            stage_steps,
+            individual=individual,
+            individual_all_bits=individual_all_bits,
+            individual_mode=individual_mode,
+            critical=critical,
+            sample=sample,
+            reducers=reducers,
+            history=history,
+            reduce_initial=(stage == 0),
+            stop_at_fixed_point=stop_at_fixed_point)
+
+        # Beliefs may have been fixed since a previous stage
+        if step_result.converged is None:
+            converged = None
+        elif converged is None or step_result.converged > 0:
+            converged = stage * steps + step_result.converged
+
+        # The first stage result already begins with the initial beliefs
+        if result is None:
+            result = step_result
+            if path is not None:
+                result = result.save(path)
+        else:
+            result.concatenate(step_result)
+        stage += stage_steps // steps if steps > 0 else 1
+
+    if result is None:
+        result = RunResult([initial_beliefs], [None], [None], [None])
+    result.converged = converged
+    return result
+
+run_discrete_trial = run_discrete
@@ -1,3 +1,9 @@
+import abc
+
+import numpy as np
+
+from .state import BeliefState, objective_values
+
 def beliefs_correct(belief_list, true_value):
     '''Calculates the fraction of agents with a correct value over time.
     #Params 
@@ -60,5 +66,118 @@ def belief_set_distance(belief_list, target_beliefs):
             total += nearest
         mean = total / len(beliefs)
         y.append(mean)
-    return y    
+    return y
+
+
+class Reducer(abc.ABC):
+    '''Base class for online metrics computed from beliefs at each step.
+
+    Pass reducers to soclearn.learn or run_discrete to record per-step
+    metrics without keeping the full belief history. Each call to update()
+    appends one value to `values`. Subclasses implement reduce().
+    '''
+
+    def __init__(self):
+        self.values = []
+
+    def update(self, beliefs):
+        '''Fold the beliefs of one step (a BeliefState or belief dict).'''
+        self.values.append(self.reduce(BeliefState.from_dict(beliefs)))
+
+    def repeat(self, beliefs, count):
+        '''Fold the same beliefs for count steps, reducing them only once.'''
+        if count > 0:
+            self.values += [self.reduce(BeliefState.from_dict(beliefs))] * count
+
+    @abc.abstractmethod
+    def reduce(self, state):
+        '''Compute the metric for a single BeliefState.'''
+
+    def reduce_batch(self, beliefs):
+        '''Compute the metric for each replicate of a (runs x agents x bits)
+        belief array, see soclearn.batch. Returns an array of length runs.'''
+        nodes = list(range(beliefs.shape[1]))
+        return np.array([self.reduce(BeliefState(matrix, nodes)) for matrix in beliefs])
+
+class BeliefsCorrect(Reducer):
+    '''Fraction of agents with a correct belief, as in beliefs_correct().'''
+
+    def __init__(self, true_value):
+        super(BeliefsCorrect, self).__init__()
+        self.true_value = np.array(true_value, dtype=np.uint8)
+
+    def reduce(self, state):
+        return (state.matrix == self.true_value).all(axis=1).mean()
+
+    def reduce_batch(self, beliefs):
+        return (beliefs == self.true_value).all(axis=2).mean(axis=1)
+
+class BeliefDistance(Reducer):
+    '''Mean fraction of bits matching the true value, as in belief_distance().'''
+
+    def __init__(self, true_value):
+        super(BeliefDistance, self).__init__()
+        self.true_value = np.array(true_value, dtype=np.uint8)
+
+    def reduce(self, state):
+        return (state.matrix == self.true_value).mean()
+
+    def reduce_batch(self, beliefs):
+        return (beliefs == self.true_value).mean(axis=(1, 2))
+
+class Consensus(Reducer):
+    '''Fraction of agents holding the most common belief.'''
+
+    def reduce(self, state):
+        unique, counts = np.unique(state.matrix, axis=0, return_counts=True)
+        return counts.max() / len(state)
+
+class MeanScore(Reducer):
+    '''Mean objective value over all agents.
+
+    Parameters
+    objective: a function mapping a belief to a number
+    scale: (optional) divide scores by this value, e.g. the global maximum
+    '''
+
+    def __init__(self, objective, scale=1):
+        super(MeanScore, self).__init__()
+        self.objective = objective
+        self.scale = scale
+
+    def reduce(self, state):
+        return objective_values(self.objective, state).mean() / self.scale
+
+    def reduce_batch(self, beliefs):
+        runs, agents, bits = beliefs.shape
+        values = objective_values(self.objective, beliefs.reshape(-1, bits))
+        return values.reshape(runs, agents).mean(axis=1) / self.scale
+
+class Snapshots(Reducer):
+    '''Keep the beliefs at every `every`th step.
+
+    `values` holds a BeliefState for each sampled step and `steps` the
+    corresponding step numbers.
+    '''
+
+    def __init__(self, every=1):
+        super(Snapshots, self).__init__()
+        self.every = every
+        self.steps = []
+        self.step = 0
+
+    def reduce(self, state):
+        return state.replace(state.matrix.copy())
+
+    def update(self, beliefs):
+        if self.step % self.every == 0:
+            self.values.append(self.reduce(BeliefState.from_dict(beliefs)))
+            self.steps.append(self.step)
+        self.step += 1
 
+    def repeat(self, beliefs, count):
+        steps = range(self.step + (-self.step % self.every), self.step + count, self.every)
+        if len(steps) > 0:
+            self.values += [self.reduce(BeliefState.from_dict(beliefs))] * len(steps)
+            self.steps += list(steps)
+        self.step += count
@@ -0,0 +1,134 @@
+import os
+
+import numpy as np
+
+from .state import decode, decode_belief, encode, encode_belief, objective_values
+
+
+def basins_path(path):
+    """Return the filename used to store basins for a landscape at path."""
+    root, ext = os.path.splitext(path)
+    return root + '.basins.npy'
+
+class Landscape(object):
+    """Objective values for every state of a landscape with few bits.
+
+    States are indexed by their integer encoding (see state.encode_belief).
+    A Landscape is callable like an objective function and also answers
+    evaluate_many() for whole belief matrices, so it can be passed to learn
+    and the learning strategies in place of the objective it was built from.
+
+    Values are stored as float32, so objectives differing by less than float32
+    precision compare equal.
+
+    Constructor parameters
+    values: array of 2^num_bits objective values
+    basins: (optional) array giving the local maximum reached from each state
+    """
+
+    def __init__(self, values, basins=None):
+        self.values = values
+        self.num_bits = int(np.log2(len(values)))
+        if len(values) != 2**self.num_bits:
+            raise ValueError('Landscape size must be a power of 2, got {}'.format(len(values)))
+        self._basins = basins
+
+    @classmethod
+    def from_objective(cls, objective, num_bits, path=None, chunk_size=2**16):
+        """Evaluate objective over all states of num_bits bits.
+
+        # Params
+        objective: a function mapping a belief to a number. If it has an
+            evaluate_many(matrix) method, each chunk is evaluated in one call.
+        num_bits: number of bits in each state
+        path: (optional) .npy filename, values are stored in a memory-mapped file
+        chunk_size: number of states to evaluate at once
+
+        # Return value
+        A new Landscape.
+        """
+        size = 2**num_bits
+        if path is None:
+            values = np.empty(size, dtype=np.float32)
+        else:
+            values = np.lib.format.open_memmap(
+                path, mode='w+', dtype=np.float32, shape=(size,))
+        for start in range(0, size, chunk_size):
+            stop = min(start + chunk_size, size)
+            states = decode(np.arange(start, stop, dtype=np.uint64), num_bits)
+            values[start:stop] = objective_values(objective, states)
+        if path is not None:
+            values.flush()
+        return cls(values)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Load a landscape stored by from_objective() or save().
+
+        Basins are loaded too if they were saved.
+        """
+        values = np.load(path, mmap_mode=mmap_mode)
+        basins = None
+        if os.path.exists(basins_path(path)):
+            basins = np.load(basins_path(path), mmap_mode=mmap_mode)
+        return cls(values, basins)
+
+    def save(self, path):
+        """Store values, and basins if computed, as .npy files."""
+        filename = getattr(self.values, 'filename', None)
+        if filename is not None and os.path.abspath(filename) == os.path.abspath(path):
+            # Values are already memory-mapped from path
+            self.values.flush()
+        else:
+            np.save(path, self.values)
+        if self._basins is not None:
+            np.save(basins_path(path), self._basins)
+
+    def __call__(self, belief):
+        return float(self.values[encode_belief(belief)])
+
+    def evaluate_many(self, matrix):
+        """Return an array of values for each row of a belief matrix."""
+        return self.values[encode(matrix).astype(np.int64)]
+
+    @property
+    def basins(self):
+        """Array mapping each state to the local maximum found from it by
+        find_local_maximum(). Computed on first access."""
+        if self._basins is None:
+            self._basins = self._find_basins()
+        return self._basins
+
+    def _find_basins(self, chunk_size=2**16):
+        size = len(self.values)
+        masks = np.left_shift(1, np.arange(self.num_bits - 1, -1, -1))
+        # Best single bit flip from each state, earliest bit on ties
+        step = np.empty(size, dtype=np.int64)
+        for start in range(0, size, chunk_size):
+            states = np.arange(start, min(start + chunk_size, size))
+            flips = states[:, None] ^ masks
+            flip_values = self.values[flips]
+            best = flip_values.argmax(axis=1)
+            rows = np.arange(len(states))
+            improves = flip_values[rows, best] > self.values[states]
+            step[states] = np.where(improves, flips[rows, best], states)
+        # Follow steps until every state reaches a fixed point
+        while True:
+            next_step = step[step]
+            if (next_step == step).all():
+                return step
+            step = next_step
+
+    def local_maximum(self, belief):
+        """Return the local maximum reached by hill-climbing from belief."""
+        return decode_belief(int(self.basins[encode_belief(belief)]), self.num_bits)
+
+    def local_maximum_many(self, matrix):
+        """Return the local maximum for each row of a belief matrix."""
+        keys = encode(matrix).astype(np.int64)
+        return decode(self.basins[keys], self.num_bits)
+
+    def global_maximum(self):
+        """Return a tuple (state, value) for the highest value state."""
+        key = int(np.argmax(self.values))
+        return decode_belief(key, self.num_bits), float(self.values[key])
@@ -1,10 +1,16 @@
-from . import strategy as slstrat
+import numpy as np
+
+from . import vectorized as slvec
+from .adjacency import Adjacency
 from .result import RunResult
+from .state import BeliefState, BeliefHistory, NeighborView, objective_values
 
 MODE_ALL = 1
 MODE_FALLBACK = 2
 MODE_BEST = 3
 
+HISTORY_CHANNELS = ('current', 'individual', 'social', 'neighbors')
+
 def learn(
         G,
         initial_beliefs,
@@ -15,14 +21,23 @@ def learn(
         individual_all_bits=True,
         individual_mode=MODE_ALL,
         critical=False,
-        sample=None):
+        sample=None,
+        reducers=None,
+        history=None,
+        reduce_initial=True,
+        stop_at_fixed_point=True,
+        incremental=False,
+        rng=None):
     '''Runs the simulation, takes the list of inital beliefs and updates each bit based on the learning strategy.
 
     # Parameters 
     - inital_beliefs: The inital beliefs of each agent before the simulation
     - learning step: The learning strategy agents will follow (see learning section above for options)
+        Strategies from soclearn.vectorized are applied to the belief matrix directly.
     - step: number of iterations
-    - individual: If True, apply individual learning at each step
+    - individual: If True, apply individual learning at each step, with
+        soclearn.vectorized.individual or individual_bit. These draw from
+        numpy's random generator (see rng), not from the random module.
     - individaul_all_bits: If True (default), apply individual learning to each
         bit of a solution, one bit at a time. Otherwise, chose a single bit at
         random.
@@ -32,94 +47,270 @@ def learn(
         MODE_BEST - chose best between individual and social
     - critical: If True, only keep social solutions that improve objective
     - sample: The number of neighbors to sample
+    - reducers: list of online metrics (see soclearn.evaluate.Reducer), each
+        updated with the beliefs at every step as they are produced
+    - history: Which histories to keep in the result, a collection of names from
+        HISTORY_CHANNELS. Defaults to all. Use history=() with reducers to keep
+        only per-step metrics.
+    - reduce_initial: If True (default), also update reducers with initial beliefs
+    - stop_at_fixed_point: If True (default), stop running learning steps once
+        a step changes no belief, when this must repeat at every later step:
+        the learning step (and individual step, if any) is marked stable
+        (see soclearn.strategy.stable) and no neighbors are sampled.
+        Histories and reducers are padded with the fixed beliefs.
+    - incremental: If True, after the first step only update agents whose own
+        or neighbors' beliefs changed in the previous step, copying the rest
+        forward. Only used under the same conditions as stop_at_fixed_point,
+        otherwise all agents are updated at every step.
+    - rng: (optional) numpy Generator or RandomState used by individual
+        learning and by strategies from soclearn.vectorized, defaults to
+        numpy.random. Strategies from soclearn.strategy draw from the random
+        module.
+    
+    Beliefs are stored internally as a matrix with one row per node, see
+    soclearn.state.BeliefState. Learning steps from soclearn.strategy still
+    receive and return dicts.
     
     # Returns 
-    A soclearn.result.RunResult
+    A soclearn.result.RunResult. Beliefs at each step are BeliefStates, which
+    behave as read-only dicts mapping nodes to belief tuples. If the run
+    stopped at a fixed point, its `converged` attribute is the step from
+    which beliefs were unchanged.
     '''
     
     # Select the function for individual learning if necessary
+    # Individual learning ignores the graph, so always runs on the matrix
     if individual:
         if individual_all_bits:
-            individual_step = slstrat.individual
+            individual_step = slvec.individual
         else:
-            individual_step = slstrat.individual_bit
+            individual_step = slvec.individual_bit
     
-    # Initialize current belief dict with initial beliefs
-    current_beliefs = dict((k, tuple(v)) for k, v in initial_beliefs.items())
+    # Initialize current beliefs as a matrix with one row per node
+    current = BeliefState.from_dict(initial_beliefs)
+    nodes = current.nodes
+    num_bit = current.num_bits
     
-    # Create lists of belief dicts over time
-    beliefs = [current_beliefs]
-    individual_candidates = [None]
-    social_candidates = [None]
+    # Create histories of beliefs over time, if requested
+    if history is None:
+        history = HISTORY_CHANNELS
+    if reducers is None:
+        reducers = []
+    beliefs = BeliefHistory(nodes, num_bit, [current])
+    individual_candidates = BeliefHistory(nodes, num_bit, [None])
+    social_candidates = BeliefHistory(nodes, num_bit, [None])
     neighbor_beliefs = [None]
-
+    if reduce_initial:
+        for reducer in reducers:
+            reducer.update(current)
+    
+    # Random choices could change beliefs later, unless every step is stable
+    stable = (
+        sample is None
+        and getattr(learning_step, 'stable', False)
+        and (not individual or getattr(individual_step, 'stable', False)))
+    detect_fixed_point = stop_at_fixed_point and stable
+    converged = None
+    
+    # Only agents near a change are updated, if every step is stable
+    incremental = incremental and stable
+    frontier = None
     
-    nodes = list(current_beliefs.keys())
-    num_bit = len(current_beliefs[nodes[0]])
+    # Vectorized learning steps, and neighbor sampling, operate on a CSR
+    # adjacency built once
+    adjacency = None
+    if incremental or sample is not None or getattr(learning_step, 'vectorized', False):
+        adjacency = Adjacency.from_graph(G, nodes)
+    step_options = dict(
+        individual_step=individual_step if individual else None,
+        individual_mode=individual_mode,
+        critical=critical,
+        objective=objective,
+        sample=sample,
+        rng=rng)
   
     # Repeatedly update beliefs
     for i in range(steps):
-
-        # Perform individual learning on all nodes, if necessary
-        if individual:
-            individual_beliefs = individual_step(G, current_beliefs, objective=objective)
-            individual_candidates.append(individual_beliefs)
-
-        # For MODE_ALL individual learning, update all nodes
-        if individual and individual_mode == MODE_ALL:
-            # Adopt individual learning results for all nodes
-            current_beliefs = individual_beliefs
-            
-        # Create dict of each node's neighbors' beliefs
-        step_neighbors = dict()
-        for v, belief in current_beliefs.items():
-            step_neighbors[v] = [current_beliefs[w] for w in G.neighbors(v)]
-        neighbor_beliefs.append(step_neighbors)
+        previous = current
         
-        # Perform social learning
-        social_beliefs = learning_step(G, current_beliefs, objective=objective, sample=sample)
-        social_candidates.append(social_beliefs)
-
-        # Adopt new beliefs based on social and individual learning
-        if individual and individual_mode == MODE_FALLBACK:
-            # Only fall back to individual belief if social learning yields previous belief
-            next_beliefs = dict()
-            for v in social_beliefs.keys():
-                if social_beliefs[v] == current_beliefs[v]:
-                    # No change from social learning, fall back to individual
-                    next_beliefs[v] = individual_beliefs[v]
-                else:
-                    next_beliefs[v] = social_beliefs[v]
-        elif individual and individual_mode == MODE_BEST:
-            # Choose best between social and individual
-            next_beliefs = dict()
-            for v in social_beliefs.keys():
-                if objective(social_beliefs[v]) > objective(individual_beliefs[v]):
-                    next_beliefs[v] = social_beliefs[v]
-                else:
-                    next_beliefs[v] = individual_beliefs[v]                
+        if frontier is None or 2 * len(frontier) > len(nodes):
+            # Update all agents
+            individual_beliefs, social_beliefs, next_beliefs = _learning_step(
+                learning_step, G, adjacency, current, **step_options)
+            rows = slice(None)
+        elif len(frontier) == 0:
+            # Nothing changed, every agent repeats its last update, including
+            # candidates rejected by critical learning
+            next_beliefs = current
+            rows = frontier
         else:
-            # Adopt all beliefs generated from social learning
-            next_beliefs = social_beliefs
-            
-        # If critical learning is enabled, only keep improvements
-        if critical:
-            for v in next_beliefs.keys():
-                if objective(next_beliefs[v]) <= objective(current_beliefs[v]):
-                        next_beliefs[v] = current_beliefs[v]
+            # Update agents in the frontier, using the beliefs of their
+            # neighbors. Other agents would repeat their last update.
+            support, sub = adjacency.neighborhood(frontier)
+            sub_state = BeliefState(current.matrix[support], sub.node_list)
+            sub_individual, sub_social, sub_next = _learning_step(
+                learning_step, sub, sub, sub_state, **step_options)
+            rows = frontier
+            local = np.searchsorted(support, frontier)
+            if individual:
+                matrix = individual_beliefs.matrix.copy()
+                matrix[support] = sub_individual.matrix
+                individual_beliefs = current.replace(matrix)
+            matrix = social_beliefs.matrix.copy()
+            matrix[frontier] = sub_social.matrix[local]
+            social_beliefs = current.replace(matrix)
+            matrix = current.matrix.copy()
+            matrix[frontier] = sub_next.matrix[local]
+            next_beliefs = current.replace(matrix)
+        
+        if individual and 'individual' in history:
+            individual_candidates.append(individual_beliefs)
+        # Neighbors' beliefs are looked up from beliefs before social learning
+        if 'neighbors' in history:
+            if individual and individual_mode == MODE_ALL:
+                neighbor_beliefs.append(NeighborView(G, individual_beliefs))
+            else:
+                neighbor_beliefs.append(NeighborView(G, current))
+        if 'social' in history:
+            social_candidates.append(social_beliefs)
+        
+        current = next_beliefs
+        if 'current' in history:
+            beliefs.append(current)
+        for reducer in reducers:
+            reducer.update(current)
+        
+        if not (detect_fixed_point or incremental):
+            continue
         
-        current_beliefs = next_beliefs
-        beliefs.append(current_beliefs)
+        # Find agents whose adopted beliefs changed. Stable steps are
+        # deterministic functions of an agent's and its neighbors' beliefs,
+        # so agents around unchanged beliefs produce the same candidates
+        # again, and adopt or reject them the same way.
+        changed = (next_beliefs.matrix[rows] != previous.matrix[rows]).any(axis=1)
+        changed = np.arange(len(nodes))[rows][changed]
+        if incremental:
+            _, neighbors = adjacency.row_entries(changed)
+            frontier = np.union1d(changed, neighbors)
+        
+        # Stop if no belief changed, later steps repeat the same candidates
+        if detect_fixed_point and len(changed) == 0:
+            converged = i
+            remaining = steps - i - 1
+            if 'current' in history:
+                beliefs.repeat(current, remaining)
+            if individual and 'individual' in history:
+                individual_candidates.repeat(individual_beliefs, remaining)
+            if 'social' in history:
+                social_candidates.repeat(social_beliefs, remaining)
+            if 'neighbors' in history:
+                neighbor_beliefs += [neighbor_beliefs[-1]] * remaining
+            for reducer in reducers:
+                reducer.repeat(current, remaining)
+            break
     
-    result = RunResult(beliefs, individual_candidates, social_candidates, neighbor_beliefs)
+    result = RunResult(
+        beliefs if 'current' in history else None,
+        individual_candidates if 'individual' in history else None,
+        social_candidates if 'social' in history else None,
+        neighbor_beliefs if 'neighbors' in history else None,
+        final=current,
+        converged=converged)
     return result
 
+def _learning_step(
+        learning_step,
+        G,
+        adjacency,
+        current,
+        individual_step=None,
+        individual_mode=MODE_ALL,
+        critical=False,
+        objective=None,
+        sample=None,
+        rng=None):
+    """Apply individual and social learning to a BeliefState.
+    
+    rng is passed to vectorized steps, which otherwise use numpy.random.
+    
+    Return
+    A tuple (individual beliefs or None, social beliefs, next beliefs)
+    """
+    individual = individual_step is not None
+    
+    # Perform individual learning on all nodes, if necessary
+    individual_beliefs = None
+    if individual:
+        individual_beliefs = current.replace(individual_step(
+            None, current.matrix, objective=objective, rng=rng))
+
+    # For MODE_ALL individual learning, update all nodes
+    if individual and individual_mode == MODE_ALL:
+        # Adopt individual learning results for all nodes
+        current = individual_beliefs
+    
+    # Perform social learning
+    if getattr(learning_step, 'vectorized', False):
+        social_beliefs = current.replace(learning_step(
+            adjacency, current.matrix, objective=objective, sample=sample, rng=rng))
+    else:
+        # Dict-based steps sample neighbors from the adjacency, if given
+        if sample is not None and adjacency is not None:
+            G = adjacency
+        social_beliefs = _apply_step(
+            learning_step, G, current, objective=objective, sample=sample)
+
+    # Adopt new beliefs based on social and individual learning
+    if individual and individual_mode == MODE_FALLBACK:
+        # Only fall back to individual belief if social learning yields previous belief
+        unchanged = (social_beliefs.matrix == current.matrix).all(axis=1)
+        next_beliefs = current.replace(np.where(
+            unchanged[:, None], individual_beliefs.matrix, social_beliefs.matrix))
+    elif individual and individual_mode == MODE_BEST:
+        # Choose best between social and individual
+        better = (
+            objective_values(objective, social_beliefs)
+            > objective_values(objective, individual_beliefs))
+        next_beliefs = current.replace(np.where(
+            better[:, None], social_beliefs.matrix, individual_beliefs.matrix))
+    else:
+        # Adopt all beliefs generated from social learning
+        next_beliefs = social_beliefs
+        
+    # If critical learning is enabled, only keep improvements
+    if critical:
+        worse = objective_values(objective, next_beliefs) <= objective_values(objective, current)
+        next_beliefs = current.replace(np.where(
+            worse[:, None], current.matrix, next_beliefs.matrix))
+    
+    return individual_beliefs, social_beliefs, next_beliefs
+
+def _apply_step(step, G, current, **kwargs):
+    """Apply a dict-based learning step to a BeliefState.
+    
+    Return
+    A BeliefState with the same nodes as current
+    """
+    new_beliefs = step(G, current.to_dict(), **kwargs)
+    return BeliefState.from_dict(new_beliefs, current.nodes, current.index)
+
 def find_local_maximum(state, objective):
     """Repeatedly change one bit at a time until a local maximum of objective is achieved.
     
+    If objective has a local_maximum(state) method, such as a
+    soclearn.landscape.Landscape, the precomputed result is used instead.
+    
     Return
     The local maximum state
     """
+    local_maximum = getattr(objective, 'local_maximum', None)
+    if local_maximum is not None:
+        return local_maximum(state)
+    
+    # Evaluate all bit flips at once if the objective supports it
+    if hasattr(objective, 'evaluate_many'):
+        return tuple(slvec.local_maximum([state], objective)[0].tolist())
+    
     num_bits = len(state)
     current_value = objective(state)
     
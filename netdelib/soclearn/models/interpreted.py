@@ -10,7 +10,8 @@ def initial_beliefs(N, num_bits, objective):
     #Params
     N: Number of agents
     num_bits: The number of bits in states
-    objective: a function mapping states to objective values
+    objective: a function mapping states to objective values, or a
+        soclearn.landscape.Landscape with precomputed local maxima
     
     #Return 
     A dict of beliefs with a noise (p_error)
@@ -19,6 +20,15 @@ def initial_beliefs(N, num_bits, objective):
     beliefs = {}
     # Generate a belief for each agent
     
+    # Look up all local maxima at once if the objective supports it
+    local_maximum_many = getattr(objective, 'local_maximum_many', None)
+    if local_maximum_many is not None:
+        starts = np.array([
+            [random.getrandbits(1) for bit in range(num_bits)]
+            for v in range(N)])
+        maxima = local_maximum_many(starts)
+        return dict((v, tuple(belief)) for v, belief in enumerate(maxima.tolist()))
+    
     for v in range(N):
         # Start with random belief
         belief = [random.getrandbits(1) for bit in range(num_bits)]
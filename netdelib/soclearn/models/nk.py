@@ -0,0 +1,92 @@
+"""NK fitness landscapes evaluated on whole belief matrices.
+
+An NK landscape over N bits gives each bit a table of random contributions,
+indexed by the values of the bit itself and K other bits. The value of a
+state is the mean contribution over all bits, raised to `exponent`.
+
+NK provides the methods of nkmodel.NK used by the simulations (get_value,
+get_values, get_global_max, get_state_maxima_map), and also evaluate_many(),
+so learn and the learning strategies evaluate all agents in one call.
+
+Example
+    model = nk.NK(bit_count, K, nk_exponent)
+    result = slearn.learn(G, beliefs, learning_strategy, model, steps)
+"""
+import numpy as np
+from numpy import random as nprand
+
+from ..landscape import Landscape
+from ..state import BeliefState, decode
+
+
+class NK(object):
+    """A random NK landscape.
+
+    Constructor parameters
+    N: number of bits
+    K: number of other bits affecting the contribution of each bit
+    exponent: (optional) power applied to the mean contribution, default 1
+    rng: (optional) source of random numbers, defaults to numpy.random
+    """
+
+    def __init__(self, N, K, exponent=1, rng=None):
+        if not 0 <= K < N:
+            raise ValueError('K must be in [0, N - 1], got {}'.format(K))
+        if rng is None:
+            rng = nprand
+        self.N = N
+        self.K = K
+        self.exponent = exponent
+
+        # Bit i depends on itself and K other bits chosen at random
+        others = np.array([[j for j in range(N) if j != i] for i in range(N)], dtype=np.int64)
+        order = np.argsort(rng.random((N, N - 1)), axis=1)[:, :K]
+        self.interactions = np.concatenate(
+            [np.arange(N)[:, None], np.take_along_axis(others, order, axis=1)], axis=1)
+
+        # One contribution for each bit and each setting of its interacting bits
+        self.contributions = rng.random((N, 2**(K + 1)))
+        self._shifts = np.arange(K, -1, -1)
+        self._landscape = None
+
+    def evaluate_many(self, matrix):
+        """Return an array of values for each row of a belief matrix."""
+        matrix = np.asarray(matrix, dtype=np.int64)
+        # (agents x N) index into the contribution table of each bit
+        index = (matrix[:, self.interactions] << self._shifts).sum(axis=2)
+        contributions = self.contributions[np.arange(self.N), index]
+        return contributions.mean(axis=1) ** self.exponent
+
+    def get_value(self, state):
+        """Return the value of a single state."""
+        return float(self.evaluate_many(np.asarray(state)[None, :])[0])
+
+    __call__ = get_value
+
+    def get_values(self, beliefs):
+        """Return a dict mapping each node of a belief dict to its value."""
+        state = BeliefState.from_dict(beliefs)
+        return dict(zip(state.nodes, self.evaluate_many(state.matrix).tolist()))
+
+    def landscape(self):
+        """Return a Landscape of the values of all 2^N states.
+
+        Computed on first call, so only practical for small N.
+        """
+        if self._landscape is None:
+            self._landscape = Landscape.from_objective(self, self.N)
+        return self._landscape
+
+    def get_global_max(self):
+        """Return a tuple (state, value) for the highest value state."""
+        state, value = self.landscape().global_maximum()
+        return state, self.get_value(state)
+
+    def get_state_maxima_map(self):
+        """Return a dict mapping every state to the local maximum reached from
+        it by hill-climbing, see soclearn.find_local_maximum()."""
+        basins = self.landscape().basins
+        states = decode(np.arange(len(basins)), self.N)
+        maxima = decode(basins, self.N)
+        return dict(zip(
+            map(tuple, states.tolist()), map(tuple, maxima.tolist())))
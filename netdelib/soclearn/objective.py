@@ -0,0 +1,102 @@
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from .state import encode, encode_belief
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+class CachedObjective(object):
+    """Objective function wrapper that memoizes values by belief.
+
+    Beliefs are keyed by their integer encoding (see state.encode_belief).
+    When num_bits is given and at most dense_bits, values are stored in a
+    dense table with one entry per possible belief. Otherwise values are kept
+    in a dict, evicting the least recently used entries beyond maxsize.
+
+    A CachedObjective can be passed anywhere an objective function is
+    expected, e.g. `learn(G, beliefs, step, CachedObjective(model.get_value))`.
+
+    Constructor parameters
+    objective: a function mapping a belief to a number
+    maxsize: maximum number of cached values, or None for no limit
+    num_bits: (optional) number of bits in each belief
+    dense_bits: largest num_bits for which a dense table is used
+    """
+
+    def __init__(self, objective, maxsize=2**20, num_bits=None, dense_bits=20):
+        self.objective = objective
+        self.maxsize = maxsize
+        self.num_bits = num_bits
+        self.hits = 0
+        self.misses = 0
+        self.dense = num_bits is not None and num_bits <= dense_bits
+        self.clear()
+
+    def clear(self):
+        """Remove all cached values and reset counters."""
+        self.hits = 0
+        self.misses = 0
+        if self.dense:
+            # NaN marks states that have not been evaluated
+            self.table = np.full(2**self.num_bits, np.nan)
+        else:
+            self.table = OrderedDict()
+
+    def cache_info(self):
+        """Return a CacheInfo tuple of hits, misses, maxsize and current size."""
+        if self.dense:
+            currsize = int(np.count_nonzero(~np.isnan(self.table)))
+            maxsize = len(self.table)
+        else:
+            currsize = len(self.table)
+            maxsize = self.maxsize
+        return CacheInfo(self.hits, self.misses, maxsize, currsize)
+
+    def __call__(self, belief):
+        key = encode_belief(belief)
+        if self.dense:
+            value = self.table[key]
+            if value == value:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = self.objective(belief)
+            self.table[key] = value
+            return value
+        try:
+            value = self.table[key]
+            self.table.move_to_end(key)
+            self.hits += 1
+            return value
+        except KeyError:
+            pass
+        self.misses += 1
+        value = self.objective(belief)
+        self.table[key] = value
+        if self.maxsize is not None and len(self.table) > self.maxsize:
+            self.table.popitem(last=False)
+        return value
+
+    def evaluate_many(self, matrix):
+        """Return an array of objective values for each row of a belief matrix."""
+        matrix = np.asarray(matrix)
+        if not self.dense:
+            return np.array([self(tuple(row)) for row in matrix.tolist()])
+        keys = encode(matrix).astype(np.int64)
+        values = self.table[keys]
+        missing = np.isnan(values)
+        self.hits += int(len(keys) - missing.sum())
+        if missing.any():
+            # Evaluate each missing state once
+            new_keys, first = np.unique(keys[missing], return_index=True)
+            new_rows = matrix[missing][first]
+            try:
+                new_values = self.objective.evaluate_many(new_rows)
+            except AttributeError:
+                new_values = [self.objective(tuple(row)) for row in new_rows.tolist()]
+            self.table[new_keys] = new_values
+            self.misses += len(new_keys)
+            self.hits += int(missing.sum()) - len(new_keys)
+            values = self.table[keys]
+        return values
@@ -1,5 +1,12 @@
 class RunResult(object):
-    def __init__(self, current=None, individual=None, social=None, neighbors=None):
+    """Beliefs recorded over the steps of a run.
+
+    Each history (current, individual, social, neighbors) is only present if
+    it was recorded. `final` holds the beliefs after the last step.
+    `converged` is the first step from which beliefs never changed, if the
+    run stopped early at a fixed point, and None otherwise.
+    """
+    def __init__(self, current=None, individual=None, social=None, neighbors=None, final=None, converged=None):
         if (current is not None):
             self.current = current
         if (individual is not None):
@@ -8,8 +15,13 @@ class RunResult(object):
             self.social = social
         if (neighbors is not None):
             self.neighbors = neighbors
+        if (final is None and current is not None and len(current) > 0):
+            final = current[-1]
+        self.final = final
+        self.converged = converged
 
     def concatenate(self, tail):
+        self.final = tail.final
         # First element is removed, should be same as last element of current (or None)
         try:
             self.current += tail.current[1:]
@@ -27,4 +39,20 @@ class RunResult(object):
             self.neighbors += tail.neighbors[1:]
         except AttributeError:
             pass
-        
\ No newline at end of file
+
+    def save(self, path):
+        """Store the current, individual and social histories in a columnar
+        trajectory directory, see soclearn.trajectory.
+
+        Returns
+        A RunResult reading from the stored files. Concatenating results onto
+        it appends to the files.
+        """
+        from .trajectory import save_result
+        return save_result(self, path)
+
+    @classmethod
+    def load(cls, path):
+        """Open a trajectory directory written by save(), memory-mapping its files."""
+        from .trajectory import load_result
+        return load_result(path)
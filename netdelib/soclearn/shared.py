@@ -0,0 +1,153 @@
+"""Publish large read-only arrays to worker processes through shared memory.
+
+A sweep creates landscapes, graphs and initial belief matrices once, in the
+parent process, and publishes them in a SharedArrays. Workers receive only
+the small, picklable handles and attach to the same memory with attach(),
+getting NumPy views instead of copies. The parent unlinks the shared memory
+when the SharedArrays is closed, at the end of the sweep.
+
+Example
+    with shared.SharedArrays() as arrays:
+        arrays.publish('landscape', landscape)
+        arrays.publish('graph', adjacency)
+        handles = arrays.handles()
+        # In each worker:
+        objects = shared.attach(handles)
+        objects['landscape'].evaluate_many(matrix)
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .adjacency import Adjacency
+from .landscape import Landscape
+
+
+class ArrayHandle(object):
+    """Picklable description of an array in shared memory.
+
+    Constructor parameters
+    name: name of the SharedMemory block
+    shape: shape of the array
+    dtype: NumPy dtype string
+    """
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+
+# SharedMemory blocks attached by this process, by name. Views stay valid
+# as long as their block is open.
+_attached = {}
+
+def attach_array(handle):
+    """Return a read-only NumPy view of an array published in shared memory."""
+    try:
+        block = _attached[handle.name]
+    except KeyError:
+        block = shared_memory.SharedMemory(name=handle.name)
+        _attached[handle.name] = block
+    array = np.ndarray(handle.shape, dtype=handle.dtype, buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+def detach():
+    """Close every SharedMemory block attached by this process.
+
+    Views returned by attach() should not be used afterwards.
+    """
+    for block in _attached.values():
+        try:
+            block.close()
+        except BufferError:
+            # Views are still in use, the memory is released with them
+            pass
+    _attached.clear()
+
+def attach(handles):
+    """Rebuild the objects published in a SharedArrays from its handles.
+
+    # Params
+    handles: dict returned by SharedArrays.handles()
+
+    # Return value
+    A dict mapping names to arrays, Landscapes and Adjacencies, all sharing
+    the published memory.
+    """
+    objects = {}
+    for name, (kind, fields) in handles.items():
+        arrays = dict((key, attach_array(handle)) for key, handle in fields.items())
+        if kind == 'landscape':
+            objects[name] = Landscape(arrays['values'], arrays.get('basins'))
+        elif kind == 'adjacency':
+            adjacency = Adjacency(arrays['indptr'], arrays['indices'])
+            adjacency.groups = arrays.get('groups')
+            objects[name] = adjacency
+        else:
+            objects[name] = arrays['array']
+    return objects
+
+class SharedArrays(object):
+    """Arrays, Landscapes and Adjacencies published in shared memory.
+
+    The creating process owns the memory: close() unlinks it, so it should
+    only be called once workers are done. Use as a context manager to close
+    it at the end of a sweep.
+    """
+
+    def __init__(self):
+        self._blocks = []
+        self._handles = {}
+
+    def _share(self, array):
+        array = np.ascontiguousarray(array)
+        # Zero-size blocks are not allowed
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._blocks.append(block)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        view[...] = array
+        return ArrayHandle(block.name, array.shape, array.dtype.str)
+
+    def publish(self, name, value):
+        """Copy a value into shared memory.
+
+        # Params
+        name: name of the value in handles() and attach()
+        value: a NumPy array, a Landscape (with its basins, if computed) or
+            an Adjacency (with its group ids, if any). Adjacencies are
+            attached with rows labelled 0 to N - 1.
+        """
+        if isinstance(value, Landscape):
+            arrays = {'values': value.values}
+            if value._basins is not None:
+                arrays['basins'] = value._basins
+            kind = 'landscape'
+        elif isinstance(value, Adjacency):
+            arrays = {'indptr': value.indptr, 'indices': value.indices}
+            if value.groups is not None:
+                arrays['groups'] = value.groups
+            kind = 'adjacency'
+        else:
+            arrays = {'array': np.asarray(value)}
+            kind = 'array'
+        fields = dict((key, self._share(array)) for key, array in arrays.items())
+        self._handles[name] = (kind, fields)
+
+    def handles(self):
+        """Return a picklable dict describing every published value, for attach()."""
+        return dict(self._handles)
+
+    def close(self):
+        """Release and unlink all shared memory published here."""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+        self._handles = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,312 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class BeliefState(Mapping):
+    """Beliefs of a whole population, stored as a single matrix.
+
+    Row i of `matrix` holds the belief of `nodes[i]`, one uint8 column per bit.
+    A BeliefState behaves as a read-only dict mapping nodes to belief tuples,
+    so it can be used anywhere the dict form of beliefs is expected.
+
+    Constructor parameters
+    matrix: (agents x bits) array of 1s and 0s
+    nodes: list of nodes, one for each row of matrix
+    index: (optional) dict mapping nodes to rows, shared between states
+    """
+
+    def __init__(self, matrix, nodes, index=None):
+        self.matrix = np.asarray(matrix, dtype=np.uint8)
+        self.nodes = nodes
+        if index is None:
+            index = dict((v, i) for i, v in enumerate(nodes))
+        self.index = index
+
+    @classmethod
+    def from_dict(cls, beliefs, nodes=None, index=None):
+        """Create a BeliefState from a dict mapping nodes to beliefs.
+
+        # Params
+        beliefs: a dict mapping nodes to lists of 1s and 0s, or a BeliefState.
+        nodes: (optional) order of rows, defaults to the order of beliefs.
+        index: (optional) dict mapping nodes to rows.
+
+        # Return value
+        A new BeliefState, or beliefs itself if it is already a BeliefState
+        with the requested node order.
+        """
+        if isinstance(beliefs, BeliefState) and (nodes is None or nodes is beliefs.nodes):
+            return beliefs
+        if nodes is None:
+            nodes = list(beliefs.keys())
+        matrix = np.array([beliefs[v] for v in nodes], dtype=np.uint8)
+        return cls(matrix, nodes, index)
+
+    @classmethod
+    def unpack(cls, packed, nodes, num_bits, index=None):
+        """Create a BeliefState from the output of BeliefState.pack()."""
+        matrix = np.unpackbits(packed, axis=1, count=num_bits)
+        return cls(matrix, nodes, index)
+
+    def pack(self):
+        """Return the beliefs as a bit-packed (agents x ceil(bits / 8)) uint8 array."""
+        return np.packbits(self.matrix, axis=1)
+
+    def replace(self, matrix):
+        """Return a new BeliefState for the same nodes with different beliefs."""
+        return BeliefState(matrix, self.nodes, self.index)
+
+    def to_dict(self):
+        """Return a dict mapping nodes to belief tuples."""
+        return dict(zip(self.nodes, map(tuple, self.matrix.tolist())))
+
+    @property
+    def num_bits(self):
+        return self.matrix.shape[1]
+
+    def __getitem__(self, v):
+        return tuple(self.matrix[self.index[v]].tolist())
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+class BeliefHistory(object):
+    """A sequence of population beliefs over time, stored bit-packed.
+
+    Elements are returned as BeliefStates (or None for steps without beliefs),
+    so a BeliefHistory can stand in for the list of belief dicts previously
+    kept by RunResult.
+
+    Constructor parameters
+    nodes: list of nodes, in row order
+    num_bits: number of bits in each belief
+    states: (optional) initial list of BeliefStates, belief dicts or None
+    """
+
+    def __init__(self, nodes, num_bits, states=None):
+        self.nodes = nodes
+        self.index = dict((v, i) for i, v in enumerate(nodes))
+        self.num_bits = num_bits
+        self._packed = []
+        # Single-element cache, consumers often index the same step repeatedly
+        self._cached = (None, None)
+        if states is not None:
+            for state in states:
+                self.append(state)
+
+    def append(self, state):
+        """Add the beliefs for one step (a BeliefState, belief dict, or None)."""
+        if state is None:
+            self._packed.append(None)
+            return
+        state = BeliefState.from_dict(state, self.nodes, self.index)
+        self._packed.append(state.pack())
+
+    def extend(self, states):
+        if isinstance(states, BeliefHistory) and states.num_bits == self.num_bits:
+            if states.nodes == self.nodes:
+                self._packed += states._packed
+                return
+        for state in states:
+            self.append(state)
+
+    def repeat(self, state, count):
+        """Add the same beliefs for count steps, sharing one packed copy."""
+        if state is not None:
+            state = BeliefState.from_dict(state, self.nodes, self.index).pack()
+        self._packed += [state] * count
+
+    def matrix(self, i):
+        """Return the (agents x bits) matrix for step i, or None."""
+        state = self[i]
+        if state is None:
+            return None
+        return state.matrix
+
+    def __iadd__(self, states):
+        self.extend(states)
+        return self
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            result = BeliefHistory(self.nodes, self.num_bits)
+            result._packed = self._packed[i]
+            return result
+        if i < 0:
+            i += len(self._packed)
+        cached_i, cached_state = self._cached
+        if cached_i == i:
+            return cached_state
+        packed = self._packed[i]
+        if packed is None:
+            return None
+        state = BeliefState.unpack(packed, self.nodes, self.num_bits, self.index)
+        self._cached = (i, state)
+        return state
+
+    def __len__(self):
+        return len(self._packed)
+
+    def __iter__(self):
+        for i in range(len(self._packed)):
+            yield self[i]
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_cached'] = (None, None)
+        return state
+
+
+class NeighborView(Mapping):
+    """Read-only dict mapping each node to a list of its neighbors' beliefs.
+
+    Neighbor lists are built on access rather than stored.
+
+    Constructor parameters
+    G: a Graph
+    state: a BeliefState
+    """
+
+    def __init__(self, G, state):
+        self.G = G
+        self.state = state
+
+    def __getitem__(self, v):
+        return [self.state[w] for w in self.G.neighbors(v)]
+
+    def __iter__(self):
+        return iter(self.state.nodes)
+
+    def __len__(self):
+        return len(self.state)
+
+
+def objective_values(objective, state):
+    '''Evaluate objective for the belief of every agent.
+
+    # Params
+    objective: a function mapping a belief to a number. If objective has an
+        evaluate_many(matrix) method, all rows are evaluated in one call.
+    state: a BeliefState or (agents x bits) matrix.
+
+    # Return value
+    An array of objective values, one per row.
+    '''
+    matrix = getattr(state, 'matrix', state)
+    try:
+        evaluate_many = objective.evaluate_many
+    except AttributeError:
+        return np.array([objective(tuple(row)) for row in matrix.tolist()])
+    return np.asarray(evaluate_many(matrix))
+
+def evaluate_beliefs(objective, beliefs):
+    '''Evaluate objective for each belief in a list.
+
+    # Params
+    objective: a function mapping a belief to a number. If objective has an
+        evaluate_many(matrix) method, all beliefs are evaluated in one call.
+    beliefs: a list of belief tuples
+
+    # Return value
+    A list of objective values.
+    '''
+    try:
+        evaluate_many = objective.evaluate_many
+    except AttributeError:
+        return [objective(belief) for belief in beliefs]
+    if len(beliefs) == 0:
+        return []
+    return np.asarray(evaluate_many(np.array(beliefs, dtype=np.uint8))).tolist()
+
+def belief_values(objective, beliefs):
+    '''Evaluate objective for the belief of every node in a dict.
+
+    # Return value
+    A dict mapping nodes to objective values, see evaluate_beliefs().
+    '''
+    nodes = list(beliefs)
+    values = evaluate_beliefs(objective, [tuple(beliefs[v]) for v in nodes])
+    return dict(zip(nodes, values))
+
+def encode_belief(belief):
+    '''Encode a belief as an integer, with the first bit most significant.'''
+    key = 0
+    for bit in belief:
+        key = (key << 1) | int(bit)
+    return key
+
+def decode_belief(key, num_bits):
+    '''Decode an integer from encode_belief() as a belief tuple.'''
+    return tuple((key >> (num_bits - 1 - i)) & 1 for i in range(num_bits))
+
+def encode(matrix):
+    '''Encode each row of a belief matrix as an integer.
+
+    # Params
+    matrix: (agents x bits) array of 1s and 0s, with at most 64 bits.
+
+    # Return value
+    A uint64 array of integers matching encode_belief() for each row.
+    '''
+    matrix = np.asarray(matrix)
+    num_bits = matrix.shape[1]
+    if num_bits > 64:
+        raise ValueError('Cannot encode more than 64 bits, got {}'.format(num_bits))
+    shifts = np.arange(num_bits - 1, -1, -1, dtype=np.uint64)
+    return (matrix.astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+
+def encode_words(matrix):
+    '''Encode each row of a belief matrix as one or more 64 bit integers.
+
+    Bits are split into words of 64, the first word holding the first bits.
+    With at most 64 bits this is encode() as a single column.
+
+    # Params
+    matrix: (agents x bits) array of 1s and 0s
+
+    # Return value
+    A (agents x ceil(bits / 64)) uint64 array.
+    '''
+    matrix = np.asarray(matrix)
+    words = [encode(matrix[:, i:i + 64]) for i in range(0, matrix.shape[1], 64)]
+    if not words:
+        return np.zeros((len(matrix), 0), dtype=np.uint64)
+    return np.stack(words, axis=1)
+
+def decode_words(words, num_bits):
+    '''Decode an array from encode_words() as a (agents x bits) matrix.'''
+    words = np.asarray(words, dtype=np.uint64)
+    columns = [
+        decode(words[:, k], min(64, num_bits - i))
+        for k, i in enumerate(range(0, num_bits, 64))]
+    if not columns:
+        return np.zeros((len(words), 0), dtype=np.uint8)
+    return np.concatenate(columns, axis=1)
+
+def belief_keys(matrix):
+    '''Find a single sortable key for each row of a belief matrix.
+
+    Equal rows have equal keys. With at most 64 bits the keys are the uint64
+    integers of encode(), otherwise the words of encode_words() are viewed as
+    one opaque value per row, ordered like the rows.
+    '''
+    matrix = np.asarray(matrix)
+    if matrix.shape[1] <= 64:
+        return encode(matrix)
+    # Big-endian bytes so that byte order matches bit order
+    words = np.ascontiguousarray(encode_words(matrix).astype('>u8'))
+    return words.view(np.dtype((np.void, words.shape[1] * 8))).reshape(-1)
+
+def decode(keys, num_bits):
+    '''Decode an array of integers from encode() as a (agents x bits) matrix.'''
+    keys = np.asarray(keys, dtype=np.uint64)
+    shifts = np.arange(num_bits - 1, -1, -1, dtype=np.uint64)
+    return ((keys[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
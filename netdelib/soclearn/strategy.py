@@ -1,9 +1,43 @@
 import random
-import networkx as nx
-import numpy as np
-from numpy import random as nprand
 from statistics import multimode, StatisticsError
 
+import numpy as np
+
+from .adjacency import Adjacency
+from .state import belief_keys, belief_values, evaluate_beliefs
+
+def stable(step):
+    '''Mark a learning step whose only random choices are among changes.
+
+    If a stable step leaves every belief unchanged, running it again on the
+    same graph, without neighbor sampling, leaves them unchanged again. soclearn.learn
+    uses this to stop early once beliefs reach a fixed point.
+    '''
+    step.stable = True
+    return step
+
+def sample_neighbors(G, sample):
+    '''Randomly choose at most `sample` neighbors of every node, all at once.
+    
+    # Params
+    G: a Graph or soclearn.adjacency.Adjacency. A Graph is converted at each
+        call, so repeated steps should pass an Adjacency, as soclearn.learn
+        does when sampling.
+    sample: None or the number of neighbors to sample
+    
+    # Return value
+    A dict mapping each node of G to a list of its sampled neighbors, or
+    None if sample is None.
+    '''
+    if sample is None:
+        return None
+    adjacency = Adjacency.from_graph(G)
+    nodes = adjacency.node_list
+    chosen = adjacency.sample_matrix(sample)
+    return dict(
+        (v, [nodes[j] for j in row if j >= 0])
+        for v, row in zip(nodes, chosen.tolist()))
+
 def find_neighbor_bit_mode(G, v, beliefs, bit):
     '''Among node v and its neighbors, find the most common belief in the specified bit.
     
@@ -16,14 +50,37 @@ def find_neighbor_bit_mode(G, v, beliefs, bit):
     # Return value
     The most common belief (at the specified bit) among v and its neighbors or beliefs[v][bit] if there is a tie.
     '''
-    neighbor_values = [beliefs[v][bit]]
-    next_belief = beliefs[v][bit]
-    neighbor_values += [beliefs[w][bit] for w in G.neighbors(v)]
-    try:
-        next_belief = multimode(neighbor_values)[0]
-    except StatisticsError: 
-        pass
-    return next_belief
+    # Bits are 0 or 1, so counting ones is enough to find the mode
+    own_bit = beliefs[v][bit]
+    total = 1
+    ones = int(own_bit)
+    for w in G.neighbors(v):
+        total += 1
+        ones += int(beliefs[w][bit])
+    if 2 * ones > total:
+        return 1
+    if 2 * ones < total:
+        return 0
+    return own_bit
+
+def find_unique_mode(candidates):
+    '''Find the single most common element of a list.
+    
+    # Params
+    candidates: a list of beliefs, or of integer-encoded beliefs
+    
+    # Return value
+    The most common element, or None if the list is empty or the most
+    common count is shared by several elements.
+    '''
+    if len(candidates) == 0:
+        return None
+    values, first, counts = np.unique(
+        np.asarray(candidates), axis=0, return_index=True, return_counts=True)
+    best = counts.max()
+    if (counts == best).sum() > 1:
+        return None
+    return candidates[first[np.argmax(counts)]]
 
 def agent_conform(belief, candidates, **kwargs):
     '''For a single agent, choose the most popluar list of beliefs among neighbors
@@ -36,16 +93,12 @@ def agent_conform(belief, candidates, **kwargs):
     # Return value
     The new belief
     '''
-    try:
-        modes = multimode(candidates)
-        if len(modes) == 1:
-            next_belief = modes[0]
-        else:
-            next_belief = belief
-    except StatisticsError: 
-        next_belief = belief
-    return next_belief
+    mode = find_unique_mode(candidates)
+    if mode is None:
+        return belief
+    return mode
 
+@stable
 def conform(G, beliefs, sample=None, **kwargs):
     '''For all nodes in G, choose the most popular list of beliefs among neighbors 
 
@@ -58,27 +111,45 @@ def conform(G, beliefs, sample=None, **kwargs):
     A dictionary mapping nodes to their new beliefs.
     '''
     
-    new_beliefs = {}
-    current_beliefs = dict(beliefs) #dict of beliefs
-    
     # Ensure tuples
-    for k, v in current_beliefs.items():
-        current_beliefs[k] = tuple(v)
-    
-    new_lists = dict((v, []) for v in G.nodes()) #a dict: intiates a list for each node v. 
-    
-    for v in new_lists:
-        for w in G.neighbors(v):
-            new_lists[v].append(current_beliefs[w]) #appends the vals of all neighbors of v in new list[v]
-    
-    temp_val = new_lists #assing new lists to temp_val. For testing purposes.
-    
-    for v in temp_val.keys(): #for each node v in temp_val find the mode using the try/except block. if there's more than one mode, keep the original list of beliefs
-        # Sample neighbors if specified
-        candidates = temp_val[v]
-        if sample is not None and len(candidates) > sample:
-            candidates = random.sample(temp_val[v], sample)
-        new_beliefs[v] = agent_conform(current_beliefs[v], candidates)
+    current_beliefs = dict((k, tuple(v)) for k, v in beliefs.items())
+    nodes = list(G.nodes())
+    if len(nodes) == 0:
+        return {}
+    index = dict((v, i) for i, v in enumerate(nodes))
+    
+    # Sample neighbors if specified
+    sampled = sample_neighbors(G, sample)
+    
+    # Rows of each node's neighbors, node by node
+    rows = []
+    cols = []
+    for i, v in enumerate(nodes):
+        neighbors = G.neighbors(v) if sampled is None else sampled[v]
+        for w in neighbors:
+            rows.append(i)
+            cols.append(index[w])
+    
+    # Number distinct beliefs, then count each (row, neighbor belief) pair
+    # in sorted segments
+    matrix = np.array([current_beliefs[v] for v in nodes], dtype=np.uint8).reshape(len(nodes), -1)
+    unique, first, ids = np.unique(belief_keys(matrix), return_index=True, return_inverse=True)
+    ids = ids.reshape(-1)
+    num_ids = len(first)
+    keys = np.asarray(rows, dtype=np.int64) * num_ids + ids[np.asarray(cols, dtype=np.int64)]
+    keys, counts = np.unique(keys, return_counts=True)
+    key_rows = keys // num_ids
+    
+    # Adopt the most common neighbor belief only when it is unique
+    row_max = np.zeros(len(nodes), dtype=np.int64)
+    np.maximum.at(row_max, key_rows, counts)
+    is_max = counts == row_max[key_rows]
+    num_modes = np.bincount(key_rows[is_max], minlength=len(nodes))
+    unique_mode = is_max & (num_modes[key_rows] == 1)
+    
+    new_beliefs = dict((v, current_beliefs[v]) for v in nodes)
+    for row, key in zip(key_rows[unique_mode].tolist(), keys[unique_mode].tolist()):
+        new_beliefs[nodes[row]] = current_beliefs[nodes[first[key % num_ids]]]
     return new_beliefs
 
 most_popular_list = conform
@@ -153,6 +224,7 @@ def random_neighbor_list(G, beliefs, **kwargs):
 rand_neighbor_list = random_neighbor_list
 
 
+@stable
 def best_neighbor(G, beliefs, objective, sample=None, **kwargs):
     '''For each node, chose the belief among neighbors that maximizes objective.
     
@@ -173,19 +245,21 @@ def best_neighbor(G, beliefs, objective, sample=None, **kwargs):
         (k, tuple(v))
         for k, v in beliefs.items())
     
+    # Evaluate objective function once for every node
+    values = belief_values(objective, current_beliefs)
+    sampled = sample_neighbors(G, sample)
+    
     # Iterates through each node
     for v in G.nodes():
         
         # Sample
-        neighbors = list(G.neighbors(v))
-        if sample is not None and len(neighbors) > sample:
-            neighbors = random.sample(neighbors, sample)
+        neighbors = list(G.neighbors(v)) if sampled is None else sampled[v]
         
-        # Evaluate objective function for all neighbors and current node
+        # Look up objective function for all neighbors and current node
         neighbor_values = dict(
-            (current_beliefs[w], objective(current_beliefs[w]))
+            (current_beliefs[w], values[w])
             for w in neighbors)
-        node_value = objective(current_beliefs[v])
+        node_value = values[v]
         neighbor_values[v] = node_value
 
         # Find belief that maximizes the objective function
@@ -203,6 +277,7 @@ def best_neighbor(G, beliefs, objective, sample=None, **kwargs):
         
     return new_beliefs
 
+@stable
 def local_majority(G, beliefs, sample=None, **kwargs):
     '''Update each node's belief by taking a majority vote among neighbors
     for each bit of the belief. In the case of a tie, the bit remains unchnaged.
@@ -217,12 +292,11 @@ def local_majority(G, beliefs, sample=None, **kwargs):
     '''
 
     new_beliefs = {}
+    sampled = sample_neighbors(G, sample)
     # Find new belief for each node
     for v in G.nodes():
         # Sample
-        neighbors = list(G.neighbors(v))
-        if sample is not None and len(neighbors) > sample:
-            neighbors = random.sample(neighbors, sample)
+        neighbors = list(G.neighbors(v)) if sampled is None else sampled[v]
         # Initialize bit
         new_bits = []
         for bit in range(len(beliefs[v])):
@@ -268,19 +342,21 @@ def confident_neighbor(G, beliefs, objective, sample=None, **kwargs):
     # Map nodes to their better neighbors
     better = {}
     
+    # Evaluate objective function once for every node
+    values = belief_values(objective, current_beliefs)
+    sampled = sample_neighbors(G, sample)
+    
     # Iterates through each node to determine "confident" nodes
     for v in G.nodes():
         
         # Sample
-        neighbors = list(G.neighbors(v))
-        if sample is not None and len(neighbors) > sample:
-            neighbors = random.sample(neighbors, sample)
+        neighbors = list(G.neighbors(v)) if sampled is None else sampled[v]
         
-        # Evaluate objective function for all neighbors and current node
+        # Look up objective function for all neighbors and current node
         neighbor_values = dict(
-            (w, objective(current_beliefs[w]))
+            (w, values[w])
             for w in neighbors)
-        node_value = objective(current_beliefs[v])
+        node_value = values[v]
 
         # Announce confidence if necessary
         # Announcement is made to all neighbors, not just sample
@@ -315,6 +391,7 @@ def confident_neighbor(G, beliefs, objective, sample=None, **kwargs):
         
     return new_beliefs
 
+@stable
 def individual(G, beliefs, objective, **kwargs):
     '''For each node, perform a single step of hill-climbing to find new belief.
     
@@ -334,21 +411,31 @@ def individual(G, beliefs, objective, **kwargs):
         (k, tuple(v))
         for k, v in beliefs.items())
     
+    # Every single bit change of every belief, evaluated together
+    nodes = list(G.nodes())
+    trial_beliefs = []
+    for v in nodes:
+        belief = current_beliefs[v]
+        trial_beliefs.append(belief)
+        for bit in range(len(belief)):
+            trial_beliefs.append(tuple(
+                belief[i] if i != bit
+                else 1 - belief[i]
+                for i in range(len(belief))))
+    all_values = evaluate_beliefs(objective, trial_beliefs)
+    
     # Iterates through each node
-    for v in G.nodes():
+    start = 0
+    for v in nodes:
 
         # Find current value
         belief = current_beliefs[v]
-        current_value = objective(belief)
+        stop = start + len(belief) + 1
+        current_value = all_values[start]
         
         # Try improving belief by hill-climbing
-        trial_values = {}
-        for bit in range(len(belief)):
-            trial_belief = tuple(
-                belief[i] if i != bit
-                else 1 - belief[i]
-                for i in range(len(belief)))
-            trial_values[tuple(trial_belief)] = objective(trial_belief)
+        trial_values = dict(zip(trial_beliefs[start + 1:stop], all_values[start + 1:stop]))
+        start = stop
 
         # Find beliefs that maximize the objective function
         # Create a list in case there are ties
@@ -392,20 +479,25 @@ def individual_bit(G, beliefs, objective, nodes=None, **kwargs):
     if nodes is None:
         nodes = G.nodes()
     
-    # Iterates through each node
+    # Try improving each belief by changing a random bit
+    nodes = list(nodes)
+    trial_beliefs = []
     for v in nodes:
-
-        # Find current value
         belief = current_beliefs[v]
-        current_value = objective(belief)
-        
-        # Try improving belief by hill-climbing
         bit = random.randint(0, len(belief) - 1)
-        trial_belief = tuple(
+        trial_beliefs.append(tuple(
             belief[i] if i != bit
             else 1 - belief[i]
-            for i in range(len(belief)))
-        trial_value = objective(trial_belief)
+            for i in range(len(belief))))
+    
+    # Evaluate current and trial beliefs together
+    values = evaluate_beliefs(
+        objective, [current_beliefs[v] for v in nodes] + trial_beliefs)
+    current_values = values[:len(nodes)]
+    trial_values = values[len(nodes):]
+    
+    for v, trial_belief, current_value, trial_value in zip(
+            nodes, trial_beliefs, current_values, trial_values):
 
         # Only change belief if it improves on the previous belief
         if trial_value > current_value:
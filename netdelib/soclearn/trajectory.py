@@ -0,0 +1,175 @@
+"""Columnar on-disk storage for RunResult histories.
+
+A trajectory is a directory containing `meta.json` and, for each stored
+history channel, two raw files:
+
+    <channel>.bits  steps x agents x ceil(bits / 8) bit-packed uint8 beliefs
+    <channel>.mask  one uint8 per step, 0 for steps without beliefs (None)
+
+Both files are only ever appended to, so a run can be written stage by
+stage, and both are read with np.memmap so single steps or agents can be
+sliced without loading the whole trajectory.
+
+Neighbor histories are not stored, they can be rebuilt from the graph.
+"""
+import itertools
+import json
+import os
+
+import numpy as np
+
+from .result import RunResult
+from .state import BeliefState
+
+CHANNELS = ('current', 'individual', 'social')
+
+class StoredHistory(object):
+    """A history of population beliefs stored on disk.
+
+    Behaves like soclearn.state.BeliefHistory: indexing returns BeliefStates
+    (or None) and `+=` appends steps, here by writing them to disk.
+
+    Constructor parameters
+    path: trajectory directory
+    channel: name of the history channel
+    nodes: list of nodes, in row order
+    num_bits: number of bits in each belief
+    """
+
+    def __init__(self, path, channel, nodes, num_bits):
+        self.path = path
+        self.channel = channel
+        self.nodes = nodes
+        self.index = dict((v, i) for i, v in enumerate(nodes))
+        self.num_bits = num_bits
+        self.row_bytes = (num_bits + 7) // 8
+        self._bits = None
+        self._mask = None
+
+    @property
+    def bits_path(self):
+        return os.path.join(self.path, self.channel + '.bits')
+
+    @property
+    def mask_path(self):
+        return os.path.join(self.path, self.channel + '.mask')
+
+    def extend(self, states):
+        """Append the beliefs for several steps (BeliefStates, dicts or None)."""
+        with open(self.bits_path, 'ab') as bits, open(self.mask_path, 'ab') as mask:
+            for state in states:
+                if state is None:
+                    packed = np.zeros((len(self.nodes), self.row_bytes), dtype=np.uint8)
+                    present = 0
+                else:
+                    state = BeliefState.from_dict(state, self.nodes, self.index)
+                    packed = state.pack()
+                    present = 1
+                bits.write(packed.tobytes())
+                mask.write(bytes([present]))
+        # Memory maps are recreated on next access to cover appended steps
+        self._bits = None
+        self._mask = None
+
+    def append(self, state):
+        self.extend([state])
+
+    def repeat(self, state, count):
+        self.extend(itertools.repeat(state, count))
+
+    def __iadd__(self, states):
+        self.extend(states)
+        return self
+
+    def mask(self):
+        """Return a memory-mapped array, nonzero for steps with beliefs."""
+        if self._mask is None:
+            if os.path.getsize(self.mask_path) == 0:
+                return np.zeros(0, dtype=np.uint8)
+            self._mask = np.memmap(self.mask_path, dtype=np.uint8, mode='r')
+        return self._mask
+
+    def bits(self):
+        """Return a memory-mapped (steps x agents x bytes) array of packed beliefs."""
+        if self._bits is None:
+            steps = len(self.mask())
+            if steps == 0:
+                return np.zeros((0, len(self.nodes), self.row_bytes), dtype=np.uint8)
+            self._bits = np.memmap(
+                self.bits_path, dtype=np.uint8, mode='r',
+                shape=(steps, len(self.nodes), self.row_bytes))
+        return self._bits
+
+    def matrix(self, i):
+        """Return the (agents x bits) matrix for step i, or None."""
+        if not self.mask()[i]:
+            return None
+        return np.unpackbits(self.bits()[i], axis=1, count=self.num_bits)
+
+    def agent(self, v):
+        """Return a (steps x bits) matrix with the beliefs of node v at each step.
+
+        Steps without beliefs are all 0s, see mask().
+        """
+        packed = self.bits()[:, self.index[v], :]
+        return np.unpackbits(packed, axis=1, count=self.num_bits)
+
+    def __len__(self):
+        return len(self.mask())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        matrix = self.matrix(i)
+        if matrix is None:
+            return None
+        return BeliefState(matrix, self.nodes, self.index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+def save_result(result, path):
+    """Write the histories of a RunResult to a new trajectory directory.
+
+    Returns
+    A RunResult reading from the stored trajectory, see load_result().
+    Concatenating onto it appends to the files on disk.
+    """
+    channels = [c for c in CHANNELS if hasattr(result, c)]
+    if result.final is None:
+        raise ValueError('Cannot save a result without beliefs')
+    final = BeliefState.from_dict(result.final)
+    os.makedirs(path, exist_ok=True)
+    meta = {
+        'nodes': list(final.nodes),
+        'num_bits': final.num_bits,
+        'channels': channels,
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    for channel in channels:
+        history = StoredHistory(path, channel, meta['nodes'], meta['num_bits'])
+        # Start with empty files
+        open(history.bits_path, 'wb').close()
+        open(history.mask_path, 'wb').close()
+        history.extend(getattr(result, channel))
+    stored = load_result(path)
+    stored.final = result.final
+    return stored
+
+def load_result(path):
+    """Open a stored trajectory as a RunResult with memory-mapped histories."""
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    histories = dict(
+        (channel, StoredHistory(path, channel, meta['nodes'], meta['num_bits']))
+        for channel in meta['channels'])
+    final = None
+    if 'current' in histories and len(histories['current']) > 0:
+        final = histories['current'][-1]
+    return RunResult(
+        histories.get('current'),
+        histories.get('individual'),
+        histories.get('social'),
+        final=final)
@@ -0,0 +1,491 @@
+"""Learning strategies operating on a belief matrix and CSR adjacency.
+
+Each strategy mirrors the function of the same name in soclearn.strategy,
+including its tie-breaking rules, but takes an Adjacency and an
+(agents x bits) belief matrix and returns a new matrix. Random choices are
+drawn from `rng` (default numpy.random) rather than the random module, one
+value per row (or per adjacency entry, when sampling neighbors), so that a
+batch of stacked replicates can draw each replicate's rows from its own
+generator, see soclearn.batch.
+"""
+import numpy as np
+from numpy import random as nprand
+
+from .state import belief_keys, objective_values
+from .strategy import stable
+
+
+def vectorized(step):
+    """Mark a learning step as operating on (Adjacency, matrix) arguments."""
+    step.vectorized = True
+    return step
+
+def belief_ids(matrix):
+    '''Assign an integer id to each distinct belief.
+
+    # Params
+    matrix: (agents x bits) array of beliefs
+
+    # Return value
+    A tuple (ids, first), where ids[i] is the id of row i and first[j] is
+    a row holding belief j.
+    '''
+    # Integer keys are much faster to sort than rows compared bit by bit
+    unique, first, ids = np.unique(
+        belief_keys(matrix), return_index=True, return_inverse=True)
+    return ids.reshape(-1), first
+
+def segment_max(values, adjacency):
+    '''Find the maximum of values over each row of an adjacency.
+
+    # Params
+    values: array with one element per entry of adjacency.indices
+    adjacency: an Adjacency
+
+    # Return value
+    Array of row maxima, -inf for rows with no neighbors.
+    '''
+    result = np.full(adjacency.num_nodes, -np.inf)
+    nonempty = adjacency.degree() > 0
+    if nonempty.any():
+        # Empty rows have zero length, so reducing from each nonempty start
+        # to the next covers exactly one row
+        result[nonempty] = np.maximum.reduceat(
+            values, adjacency.indptr[:-1][nonempty])
+    return result
+
+def segment_sum(values, adjacency):
+    '''Sum (edges x ...) values over each row of an adjacency.'''
+    total = np.zeros((len(values) + 1,) + values.shape[1:], dtype=np.int64)
+    np.cumsum(values, axis=0, out=total[1:])
+    return total[adjacency.indptr[1:]] - total[adjacency.indptr[:-1]]
+
+def random_index(counts, rng):
+    '''Choose a random integer in [0, counts[i]) for each element of counts.'''
+    return np.minimum(
+        (rng.random(len(counts)) * counts).astype(np.int64),
+        counts - 1)
+
+def choose_entry(keys, rows, num_rows, rng):
+    '''Uniformly choose one of the keys belonging to each row.
+
+    # Params
+    keys: array of candidates
+    rows: sorted array giving the row of each key
+    num_rows: total number of rows
+    rng: source of random numbers
+
+    # Return value
+    A tuple (has, chosen) where has is a boolean array marking rows with at
+    least one candidate and chosen holds the selected key for those rows.
+    '''
+    counts = np.bincount(rows, minlength=num_rows)
+    has = counts > 0
+    starts = np.cumsum(counts) - counts
+    # Draw for every row, so each row's choice has its own random number
+    offsets = random_index(counts, rng)
+    chosen = keys[starts[has] + offsets[has]]
+    return has, chosen
+
+def clique_groups(adjacency, sampled, groups=None):
+    '''Find group ids if the graph is a disjoint union of cliques.
+
+    # Params
+    adjacency: an Adjacency
+    sampled: the Adjacency after sampling neighbors
+    groups: (optional) array of group ids given by the caller
+
+    # Return value
+    An array of group ids, or None if neighborhoods are not whole groups
+    (the graph is not a union of cliques, or neighbors were sampled).
+    '''
+    if groups is None:
+        groups = adjacency.groups
+    if groups is None or sampled is not adjacency:
+        return None
+    return np.asarray(groups, dtype=np.int64)
+
+def group_sum(values, groups):
+    '''Sum (agents x ...) values over each group.
+
+    # Return value
+    A tuple (sums, sizes) with one element per group id.
+    '''
+    sizes = np.bincount(groups)
+    order = np.argsort(groups, kind='stable')
+    nonempty = sizes > 0
+    starts = (np.cumsum(sizes) - sizes)[nonempty]
+    sums = np.zeros((len(sizes),) + values.shape[1:], dtype=np.int64)
+    sums[nonempty] = np.add.reduceat(values[order].astype(np.int64), starts, axis=0)
+    return sums, sizes
+
+def _group_conform(matrix, groups):
+    ids, first = belief_ids(matrix)
+    num_ids = len(first)
+    keys, counts = np.unique(groups * num_ids + ids, return_counts=True)
+    key_groups = keys // num_ids
+
+    # Three most common beliefs in each group
+    order = np.lexsort((-counts, key_groups))
+    sorted_groups = key_groups[order]
+    rank = np.arange(len(order)) - np.searchsorted(sorted_groups, sorted_groups)
+    top = rank < 3
+    top_counts = np.zeros((groups.max() + 1, 3), dtype=np.int64)
+    top_ids = np.full((groups.max() + 1, 3), -1, dtype=np.int64)
+    top_counts[sorted_groups[top], rank[top]] = counts[order][top]
+    top_ids[sorted_groups[top], rank[top]] = keys[order][top] % num_ids
+
+    # A row's neighbors are its group minus itself, so its own belief counts
+    # one less. The two most common other beliefs are among the top three.
+    own_counts = counts[np.searchsorted(keys, groups * num_ids + ids)]
+    others = top_ids[groups] != ids[:, None]
+    position = np.argsort(~others, axis=1, kind='stable')[:, :2]
+    other_counts = np.take_along_axis(
+        np.where(others, top_counts[groups], 0), position, axis=1)
+    other_ids = np.take_along_axis(
+        np.where(others, top_ids[groups], -1), position, axis=1)
+
+    # Adopt another belief only if it is the unique mode among neighbors
+    adopt = (
+        (other_ids[:, 0] >= 0)
+        & (other_counts[:, 0] > other_counts[:, 1])
+        & (other_counts[:, 0] > own_counts - 1))
+    result = matrix.copy()
+    result[adopt] = matrix[first[other_ids[adopt, 0]]]
+    return result
+
+@stable
+@vectorized
+def conform(adjacency, matrix, sample=None, rng=None, groups=None, **kwargs):
+    '''For all rows, choose the most popular belief among neighbors, or keep
+    the current belief if there is no single most popular belief.
+
+    # Params
+    adjacency: an Adjacency
+    matrix: (agents x bits) array of beliefs
+    sample: None (default) or the number of neighbors to randomly sample.
+    rng: (optional) source of random numbers, defaults to numpy.random
+    groups: (optional) group ids if the graph is a disjoint union of cliques,
+        defaults to adjacency.groups. Counts are then made once per group.
+
+    # Return value
+    New (agents x bits) array of beliefs.
+    '''
+    if rng is None:
+        rng = nprand
+    sampled = adjacency.sample(sample, rng)
+    groups = clique_groups(adjacency, sampled, groups)
+    if groups is not None:
+        return _group_conform(matrix, groups)
+    adjacency = sampled
+    ids, first = belief_ids(matrix)
+    num_ids = len(first)
+
+    # Count each distinct (row, neighbor belief) pair
+    keys = adjacency.edge_rows() * num_ids + ids[adjacency.indices]
+    keys, counts = np.unique(keys, return_counts=True)
+    rows = keys // num_ids
+
+    # Find beliefs with the highest count in each row
+    row_max = np.zeros(adjacency.num_nodes, dtype=np.int64)
+    np.maximum.at(row_max, rows, counts)
+    is_max = counts == row_max[rows]
+    num_modes = np.bincount(rows[is_max], minlength=adjacency.num_nodes)
+
+    # Adopt the mode only when it is unique
+    unique_mode = is_max & (num_modes[rows] == 1)
+    result = matrix.copy()
+    result[rows[unique_mode]] = matrix[first[keys[unique_mode] % num_ids]]
+    return result
+
+most_popular_list = conform
+
+@vectorized
+def random_neighbor_bit(adjacency, matrix, rng=None, **kwargs):
+    '''For each row, create a new belief by choosing each bit randomly
+    from the beliefs of the row and its neighbors.
+
+    # Params
+    adjacency: an Adjacency
+    matrix: (agents x bits) array of beliefs
+    rng: (optional) source of random numbers, defaults to numpy.random
+
+    # Return value
+    New (agents x bits) array of beliefs.
+    '''
+    if rng is None:
+        rng = nprand
+    num_nodes, num_bits = matrix.shape
+    if len(adjacency.indices) == 0:
+        return matrix.copy()
+    degree = adjacency.degree()
+    # Choice in [0, degree]; degree selects the row itself
+    choice = np.minimum(
+        (rng.random((num_nodes, num_bits)) * (degree + 1)[:, None]).astype(np.int64),
+        degree[:, None])
+    own = choice == degree[:, None]
+    position = np.where(own, 0, adjacency.indptr[:-1, None] + choice)
+    source = np.where(own, np.arange(num_nodes)[:, None], adjacency.indices[position])
+    return matrix[source, np.arange(num_bits)]
+
+@vectorized
+def random_neighbor_list(adjacency, matrix, rng=None, **kwargs):
+    '''For each row, adopt the whole belief of a random neighbor or itself.
+
+    # Params
+    adjacency: an Adjacency
+    matrix: (agents x bits) array of beliefs
+    rng: (optional) source of random numbers, defaults to numpy.random
+
+    # Return value
+    New (agents x bits) array of beliefs.
+    '''
+    if rng is None:
+        rng = nprand
+    if len(adjacency.indices) == 0:
+        return matrix.copy()
+    degree = adjacency.degree()
+    choice = random_index(degree + 1, rng)
+    own = choice == degree
+    position = np.where(own, 0, adjacency.indptr[:-1] + choice)
+    source = np.where(own, np.arange(len(degree)), adjacency.indices[position])
+    return matrix[source]
+
+rand_neighbor_list = random_neighbor_list
+
+def _group_best_neighbor(matrix, values, groups, rng):
+    group_max = np.full(groups.max() + 1, -np.inf)
+    np.maximum.at(group_max, groups, values)
+    improve = np.flatnonzero(group_max[groups] > values)
+
+    # Distinct best beliefs in each group
+    ids, first = belief_ids(matrix)
+    num_ids = len(first)
+    best = values == group_max[groups]
+    keys = np.unique(groups[best] * num_ids + ids[best])
+    counts = np.bincount(keys // num_ids, minlength=len(group_max))
+    starts = np.cumsum(counts) - counts
+
+    # Each improving row chooses independently among its group's best
+    offsets = random_index(counts[groups], rng)[improve]
+    chosen = keys[starts[groups[improve]] + offsets]
+    result = matrix.copy()
+    result[improve] = matrix[first[chosen % num_ids]]
+    return result
+
+@stable
+@vectorized
+def best_neighbor(adjacency, matrix, objective, sample=None, rng=None, groups=None, **kwargs):
+    '''For each row, choose the belief among neighbors that maximizes objective.
+
+    Rows keep their belief unless a neighbor's is strictly better. Ties among
+    the best neighbors are broken uniformly over distinct beliefs.
+
+    # Params
+    adjacency: an Adjacency
+    matrix: (agents x bits) array of beliefs
+    objective: a function mapping a belief to a number.
+    sample: None (default) or the number of neighbors to randomly sample.
+    rng: (optional) source of random numbers, defaults to numpy.random
+    groups: (optional) group ids if the graph is a disjoint union of cliques,
+        defaults to adjacency.groups. The best belief is then found once per group.
+
+    # Return value
+    New (agents x bits) array of beliefs.
+    '''
+    if rng is None:
+        rng = nprand
+    sampled = adjacency.sample(sample, rng)
+    groups = clique_groups(adjacency, sampled, groups)
+    values = objective_values(objective, matrix)
+    if groups is not None:
+        return _group_best_neighbor(matrix, values, groups, rng)
+    adjacency = sampled
+    neighbor_values = values[adjacency.indices]
+    row_max = segment_max(neighbor_values, adjacency)
+    improve = row_max > values
+
+    # Distinct best beliefs for rows that can improve
+    ids, first = belief_ids(matrix)
+    num_ids = len(first)
+    rows = adjacency.edge_rows()
+    best = improve[rows] & (neighbor_values == row_max[rows])
+    keys = np.unique(rows[best] * num_ids + ids[adjacency.indices[best]])
+
+    has, chosen = choose_entry(keys, keys // num_ids, adjacency.num_nodes, rng)
+    result = matrix.copy()
+    result[has] = matrix[first[chosen % num_ids]]
+    return result
+
+@stable
+@vectorized
+def local_majority(adjacency, matrix, sample=None, rng=None, groups=None, **kwargs):
+    '''Update each row's belief by taking a majority vote among the row and
+    its neighbors for each bit. In the case of a tie, the bit remains unchanged.
+
+    # Params
+    adjacency: an Adjacency
+    matrix: (agents x bits) array of beliefs
+    sample: None (default) or the number of neighbors to randomly sample.
+    rng: (optional) source of random numbers, defaults to numpy.random
+    groups: (optional) group ids if the graph is a disjoint union of cliques,
+        defaults to adjacency.groups. Votes are then counted once per group.
+
+    # Return value
+    New (agents x bits) array of beliefs.
+    '''
+    if rng is None:
+        rng = nprand
+    sampled = adjacency.sample(sample, rng)
+    groups = clique_groups(adjacency, sampled, groups)
+    if groups is not None:
+        # Each row and its neighbors make up its whole group
+        sums, sizes = group_sum(matrix, groups)
+        ones = sums[groups]
+        total = sizes[groups]
+    else:
+        ones = matrix + segment_sum(matrix[sampled.indices], sampled)
+        total = sampled.degree() + 1
+    zeros = total[:, None] - ones
+    return np.where(
+        ones > zeros, 1, np.where(zeros > ones, 0, matrix)).astype(np.uint8)
+
+learning_step_bit_majority = local_majority
+
+@vectorized
+def confident_neighbor(adjacency, matrix, objective, sample=None, rng=None, **kwargs):
+    '''For each row, choose the belief of a neighbor having the best solution
+    in its own neighborhood.
+
+    Rows whose value is at least that of all (sampled) neighbors announce
+    confidence to all of their neighbors. Each row adopts the belief of a
+    random confident neighbor, otherwise of a random better neighbor,
+    otherwise keeps its own.
+
+    # Params
+    adjacency: an Adjacency
+    matrix: (agents x bits) array of beliefs
+    objective: a function mapping a belief to a number.
+    sample: None (default) or the number of neighbors to randomly sample.
+    rng: (optional) source of random numbers, defaults to numpy.random
+
+    # Return value
+    New (agents x bits) array of beliefs.
+    '''
+    if rng is None:
+        rng = nprand
+    values = objective_values(objective, matrix)
+    sampled = adjacency.sample(sample, rng)
+    confident = values >= segment_max(values[sampled.indices], sampled)
+
+    # Better neighbors are chosen among the sample
+    rows = sampled.edge_rows()
+    better = values[sampled.indices] > values[rows]
+    has_better, better_choice = choose_entry(
+        sampled.indices[better], rows[better], sampled.num_nodes, rng)
+
+    # Confident neighbors are chosen among all neighbors
+    rows = adjacency.edge_rows()
+    announced = confident[adjacency.indices]
+    has_confident, confident_choice = choose_entry(
+        adjacency.indices[announced], rows[announced], adjacency.num_nodes, rng)
+
+    source = np.arange(adjacency.num_nodes)
+    source[has_better] = better_choice
+    source[has_confident] = confident_choice
+    return matrix[source]
+
+def flip_values(objective, matrix):
+    '''Evaluate every row of a belief matrix and each of its single bit changes.
+
+    All beliefs are scored in one call to objective_values(), so objectives
+    with an evaluate_many() method are called once.
+
+    # Params
+    objective: a function mapping a belief to a number.
+    matrix: (agents x bits) array of beliefs
+
+    # Return value
+    A tuple (values, flipped), with values[i] the value of row i and
+    flipped[i, b] the value of row i with bit b changed.
+    '''
+    num_nodes, num_bits = matrix.shape
+    # (agents x bits x bits), slice b of row i differs from row i in bit b
+    flips = matrix[:, None, :] ^ np.eye(num_bits, dtype=matrix.dtype)
+    values = objective_values(
+        objective, np.concatenate([matrix, flips.reshape(-1, num_bits)]))
+    return values[:num_nodes], values[num_nodes:].reshape(num_nodes, num_bits)
+
+@stable
+@vectorized
+def individual(adjacency, matrix, objective, rng=None, **kwargs):
+    '''For each row, perform a single step of hill-climbing to find a new belief.
+
+    Each row changes the bit giving the highest objective value, choosing
+    uniformly among ties, if that improves on its current value.
+
+    # Params
+    adjacency: an Adjacency (unused, may be None)
+    matrix: (agents x bits) array of beliefs
+    objective: a function mapping a belief to a number.
+    rng: (optional) source of random numbers, defaults to numpy.random
+
+    # Return value
+    New (agents x bits) array of beliefs.
+    '''
+    if rng is None:
+        rng = nprand
+    values, flipped = flip_values(objective, matrix)
+    best_value = flipped.max(axis=1)
+    improve = np.flatnonzero(best_value > values)
+
+    # Choose the kth best bit of each improving row at random
+    is_best = flipped == best_value[:, None]
+    choice = random_index(is_best.sum(axis=1), rng)[improve]
+    bit = np.argmax(np.cumsum(is_best[improve], axis=1) > choice[:, None], axis=1)
+
+    result = matrix.copy()
+    result[improve, bit] ^= 1
+    return result
+
+@vectorized
+def individual_bit(adjacency, matrix, objective, rng=None, **kwargs):
+    '''For each row, change a single bit at random and keep the new belief if
+    it improves the objective function.
+
+    # Params
+    adjacency: an Adjacency (unused, may be None)
+    matrix: (agents x bits) array of beliefs
+    objective: a function mapping a belief to a number.
+    rng: (optional) source of random numbers, defaults to numpy.random
+
+    # Return value
+    New (agents x bits) array of beliefs.
+    '''
+    if rng is None:
+        rng = nprand
+    num_nodes, num_bits = matrix.shape
+    trial = matrix.copy()
+    trial[np.arange(num_nodes), random_index(np.full(num_nodes, num_bits), rng)] ^= 1
+    values = objective_values(objective, np.concatenate([matrix, trial]))
+    improve = values[num_nodes:] > values[:num_nodes]
+    return np.where(improve[:, None], trial, matrix)
+
+def local_maximum(matrix, objective):
+    '''Hill-climb from every row of a belief matrix until no single bit change
+    improves the objective, as soclearn.find_local_maximum() does for one belief.
+
+    At each step a row changes the first of its best bits.
+
+    # Return value
+    An (agents x bits) array of local maxima.
+    '''
+    matrix = np.array(matrix, dtype=np.uint8)
+    active = np.arange(len(matrix))
+    while len(active) > 0:
+        values, flipped = flip_values(objective, matrix[active])
+        bit = flipped.argmax(axis=1)
+        improve = flipped[np.arange(len(active)), bit] > values
+        active, bit = active[improve], bit[improve]
+        matrix[active, bit] ^= 1
+    return matrix
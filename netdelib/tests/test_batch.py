@@ -0,0 +1,76 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+
+import soclearn
+from soclearn import batch
+from soclearn import evaluate as sleval
+from soclearn import strategy
+from soclearn import vectorized
+from soclearn.adjacency import Adjacency
+
+N = 30
+true_value = (1, 1, 1, 1)
+
+class StaticFactory(object):
+    stage_graphs = False
+    def __init__(self):
+        self.G = nx.barabasi_albert_graph(N, 2, seed=0)
+    def create_adjacency(self, stage):
+        return Adjacency.from_graph(self.G, list(range(N)))
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.initial = [
+            dict((v, tuple(rng.randint(0, 2, 4))) for v in range(N))
+            for run in range(3)]
+
+    def test_stack_adjacencies(self):
+        first = Adjacency.from_groups([0, 0, 1])
+        second = Adjacency.from_groups([0, 0])
+        stacked = batch.stack_adjacencies([first, second])
+        self.assertEqual(stacked.neighbors(3), [4])
+        self.assertEqual(stacked.neighbors(0), [1])
+        self.assertEqual(list(stacked.groups), [0, 0, 1, 2, 2])
+
+    def test_run_batch(self):
+        factory = StaticFactory()
+        correct = sleval.BeliefsCorrect(true_value)
+        result = batch.run_batch(
+            factory, vectorized.local_majority, self.initial, None, N, 3, 2, 4,
+            reducers=[correct], seed=0)
+        self.assertEqual(result.metrics[0].shape, (3, 9))
+        # Local majority is deterministic, so each replicate matches a single run
+        for run, beliefs in enumerate(self.initial):
+            single = sleval.BeliefsCorrect(true_value)
+            soclearn.learn(
+                factory.G, beliefs, vectorized.local_majority, steps=8,
+                reducers=[single], history=())
+            self.assertTrue(np.allclose(result.metrics[0][run], single.values))
+
+    def test_replicate_streams(self):
+        # Each replicate draws from its own generator, so dropping the last
+        # replicate leaves the others unchanged
+        factory = StaticFactory()
+        for step, options in [
+                (vectorized.random_neighbor_bit, {}),
+                (vectorized.conform, {'sample': 1}),
+                (vectorized.local_majority, {'individual': True, 'individual_all_bits': False})]:
+            full = batch.run_batch(
+                factory, step, self.initial, sum, N, 3, 2, 4, seed=0, **options)
+            fewer = batch.run_batch(
+                factory, step, self.initial[:2], sum, N, 3, 2, 4, seed=0, **options)
+            self.assertTrue((full.final[:2] == fewer.final).all())
+
+    def test_dict_step_rejected(self):
+        # Dict-based steps would share the global random generator
+        with self.assertRaises(ValueError):
+            batch.run_batch(
+                StaticFactory(), strategy.conform, self.initial, None, N, 3, 1, 1, seed=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
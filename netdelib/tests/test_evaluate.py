@@ -0,0 +1,82 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+
+import soclearn
+import soclearn.evaluate as sleval
+from soclearn import strategy
+from soclearn.discrete import run_discrete
+
+G = nx.Graph()
+G.add_edges_from([
+    (0, 1), (0, 2), (0, 3), (0, 4),
+    (7, 3), (7, 4), (7, 5), (7, 6)
+])
+
+true_value = [1, 0, 1, 0, 1, 0]
+
+initial = {
+    0: [0, 0, 1, 0, 1, 0],
+    1: [1, 1, 1, 0, 1, 0],
+    2: [1, 0, 0, 0, 1, 0],
+    3: [1, 0, 1, 1, 1, 0],
+    4: [1, 0, 1, 0, 0, 0],
+    5: [1, 0, 1, 0, 1, 1],
+    6: [1, 0, 1, 0, 1, 1],
+    7: [1, 0, 1, 0, 1, 0]
+}
+
+def obj(x):
+    return sum(1 for i, v in enumerate(true_value) if x[i] == v)
+
+class StaticFactory(object):
+    stage_graphs = False
+    def create(self, stage):
+        return G
+
+class TestEvaluate(unittest.TestCase):
+
+    def test_reducers(self):
+        full = soclearn.learn(G, initial, strategy.local_majority, steps=3)
+        reducers = [
+            sleval.BeliefsCorrect(true_value),
+            sleval.BeliefDistance(true_value),
+            sleval.MeanScore(obj),
+            sleval.Consensus(),
+            sleval.Snapshots(2),
+        ]
+        summary = soclearn.learn(
+            G, initial, strategy.local_majority, steps=3,
+            reducers=reducers, history=())
+        self.assertFalse(hasattr(summary, 'current'))
+        self.assertFalse(hasattr(summary, 'neighbors'))
+        self.assertEqual(summary.final, full.current[-1])
+        np.testing.assert_allclose(
+            reducers[0].values, sleval.beliefs_correct(full.current, true_value))
+        np.testing.assert_allclose(
+            reducers[1].values, sleval.belief_distance(full.current, true_value))
+        np.testing.assert_allclose(
+            reducers[2].values, [np.mean([obj(b) for b in c.values()]) for c in full.current])
+        self.assertEqual(reducers[3].values[0], 2 / 8)
+        self.assertEqual(reducers[4].steps, [0, 2])
+        self.assertEqual(reducers[4].values[1], full.current[2])
+
+    def test_reduce_required(self):
+        class Incomplete(sleval.Reducer):
+            pass
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_run_discrete(self):
+        correct = sleval.BeliefsCorrect(true_value)
+        result = run_discrete(
+            StaticFactory(), strategy.local_majority, initial, obj, 8, 4, 3, 2,
+            reducers=[correct], history=('current',))
+        self.assertEqual(len(result.current), 7)
+        self.assertFalse(hasattr(result, 'social'))
+        self.assertEqual(correct.values, sleval.beliefs_correct(result.current, true_value))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+
+import unittest
+
+import networkx as nx
+
+from soclearn.adjacency import Adjacency
+from topologies import factories
+
+N = 24
+M = 4
+
+def edge_set(adjacency):
+    return set(zip(adjacency.edge_rows().tolist(), adjacency.indices.tolist()))
+
+class TestFactories(unittest.TestCase):
+
+    def check_factory(self, factory, stages=3):
+        nodes = list(range(factory.N))
+        for stage in range(stages):
+            random.seed(stage)
+            expected = edge_set(Adjacency.from_graph(factory.create(stage), nodes))
+            for create in (factory.create_csr, factory.create_adjacency):
+                random.seed(stage)
+                adjacency = create(stage)
+                self.assertEqual(adjacency.num_nodes, factory.N)
+                self.assertEqual(edge_set(adjacency), expected)
+
+    def test_group_factories(self):
+        self.check_factory(factories.LongPathFactory(N, M))
+        self.check_factory(factories.RandomGroupFactory(N, M))
+        # Groups do not divide N evenly
+        self.check_factory(factories.LongPathFactory(N + 2, M))
+        self.check_factory(factories.RandomGroupFactory(N + 2, M))
+
+    def test_group_ids(self):
+        adjacency = factories.LongPathFactory(N, M).create_csr(1)
+        self.assertEqual(len(adjacency.groups), N)
+
+    def test_static_factories(self):
+        # Parameters for which random generators are deterministic
+        self.check_factory(factories.CompleteFactory(N, M), 1)
+        self.check_factory(factories.RandomFactory(N, M, 1.0), 1)
+        self.check_factory(factories.RandomFactory(N, M, 0.0), 1)
+        self.check_factory(factories.SmallWorldFactory(N, M, 4, 0.0), 1)
+        self.check_factory(factories.PreferentialFactory(M + 1, M, M), 1)
+        # A single block of two with no edges inside it, plus a lone node
+        self.check_factory(factories.StochasticBlockFactory(3, 2), 1)
+
+    def test_create_groups_required(self):
+        with self.assertRaises(TypeError):
+            factories.GroupFactory(N, M)
+
+    def test_clique_union(self):
+        groups = [{0, 1, 2}, {3}, {4, 5}, {6, 7, 8, 9}]
+        G = factories.clique_union(groups)
+        expected = nx.compose_all([nx.complete_graph(group) for group in groups])
+        self.assertEqual(set(G.nodes()), set(expected.nodes()))
+        self.assertEqual(
+            set(map(frozenset, G.edges())), set(map(frozenset, expected.edges())))
+
+
+if __name__ == '__main__':
+    unittest.main()
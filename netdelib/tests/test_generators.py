@@ -0,0 +1,99 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+
+from soclearn.adjacency import Adjacency
+from topologies import generators as gen
+
+def edge_pairs(adjacency):
+    return list(zip(adjacency.edge_rows().tolist(), adjacency.indices.tolist()))
+
+def mean_edges(graphs):
+    return np.mean([len(graph.indices) // 2 for graph in graphs])
+
+def mean_nx_edges(graphs):
+    return np.mean([graph.number_of_edges() for graph in graphs])
+
+class TestGenerators(unittest.TestCase):
+
+    def check_graph(self, adjacency, N):
+        self.assertEqual(adjacency.num_nodes, N)
+        pairs = edge_pairs(adjacency)
+        self.assertEqual(len(set(pairs)), len(pairs))
+        self.assertTrue(all(u != v for u, v in pairs))
+        self.assertEqual(set(pairs), set((v, u) for u, v in pairs))
+
+    def test_erdos_renyi(self):
+        graphs = [gen.erdos_renyi(100, 0.05, np.random.default_rng(seed)) for seed in range(40)]
+        for graph in graphs:
+            self.check_graph(graph, 100)
+        expected = mean_nx_edges(nx.erdos_renyi_graph(100, 0.05, seed=seed) for seed in range(40))
+        # About 250 edges, with a standard deviation of 3 over 40 graphs
+        self.assertAlmostEqual(mean_edges(graphs), expected, delta=15)
+
+    def test_planted_partition(self):
+        graphs = [
+            gen.planted_partition(50, 4, 12, 0.5, 0.02, np.random.default_rng(seed))
+            for seed in range(40)]
+        for graph in graphs:
+            self.check_graph(graph, 50)
+            # Nodes beyond the blocks have no edges
+            self.assertEqual(list(graph.degree()[48:]), [0, 0])
+        expected = mean_nx_edges(
+            nx.stochastic_block_model(
+                [12] * 4, [[0.5 if r == s else 0.02 for s in range(4)] for r in range(4)],
+                seed=seed)
+            for seed in range(40))
+        self.assertAlmostEqual(mean_edges(graphs), expected, delta=10)
+
+    def test_preferential_attachment(self):
+        for N, m in [(8, 2), (200, 3)]:
+            expected = nx.barabasi_albert_graph(N, m, seed=0)
+            for seed in range(20):
+                graph = gen.preferential_attachment(N, m, np.random.default_rng(seed))
+                self.check_graph(graph, N)
+                self.assertEqual(len(graph.indices) // 2, expected.number_of_edges())
+                # Each new node has m distinct targets
+                self.assertTrue((graph.degree()[m + 1:] >= m).all())
+                self.assertEqual(graph.degree()[-1], m)
+        with self.assertRaises(ValueError):
+            gen.preferential_attachment(3, 3)
+
+    def test_watts_strogatz(self):
+        for p in (0.0, 0.3, 1.0):
+            graphs = [gen.watts_strogatz(60, 4, p, np.random.default_rng(seed)) for seed in range(10)]
+            for graph in graphs:
+                self.check_graph(graph, 60)
+                self.assertEqual(len(graph.indices) // 2, nx.watts_strogatz_graph(60, 4, p).number_of_edges())
+                self.assertEqual(graph.degree().mean(), 4)
+        ring = gen.watts_strogatz(10, 2, 0.0)
+        self.assertEqual(sorted(ring.neighbors(0)), [1, 9])
+
+    def test_complete(self):
+        graph = gen.complete(5)
+        self.check_graph(graph, 5)
+        self.assertEqual(list(graph.degree()), [4] * 5)
+
+    def test_empty(self):
+        for seed in range(20):
+            rng = np.random.default_rng(seed)
+            self.check_graph(gen.erdos_renyi(5, 0.01, rng), 5)
+            self.check_graph(gen.planted_partition(6, 3, 2, 0.0, 0.0, rng), 6)
+        empty = gen.erdos_renyi(100, 0.0)
+        self.check_graph(empty, 100)
+        self.assertEqual(len(empty.indices), 0)
+        self.assertEqual(gen.edges_to_adjacency([], [], 3).neighbors(2), [])
+        # Only self-loops, which are dropped
+        self.assertEqual(len(gen.edges_to_adjacency([1], [1], 3).indices), 0)
+
+    def test_single_node(self):
+        for graph in (
+                gen.erdos_renyi(1, 0.5), gen.complete(1), gen.watts_strogatz(1, 0, 0.5),
+                gen.planted_partition(1, 1, 1, 1.0, 1.0)):
+            self.check_graph(graph, 1)
+            self.assertEqual(len(graph.indices), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+import unittest
+
+import numpy as np
+
+import soclearn
+from soclearn.landscape import Landscape
+
+num_bits = 6
+
+# Fixed random objective with many local maxima
+values = dict(
+    (i, v) for i, v in enumerate(
+        np.random.RandomState(3).permutation(2**num_bits).astype(float)))
+
+def obj(x):
+    return values[int(''.join(str(b) for b in x), 2)]
+
+class TestLandscape(unittest.TestCase):
+
+    def test_values(self):
+        landscape = Landscape.from_objective(obj, num_bits, chunk_size=16)
+        for i in range(2**num_bits):
+            state = tuple(int(b) for b in format(i, '06b'))
+            self.assertEqual(landscape(state), obj(state))
+        matrix = np.array([[0, 0, 0, 0, 0, 1], [1, 1, 1, 1, 1, 1]])
+        self.assertEqual(list(landscape.evaluate_many(matrix)), [values[1], values[63]])
+
+    def test_local_maximum(self):
+        landscape = Landscape.from_objective(obj, num_bits)
+        for i in range(2**num_bits):
+            state = tuple(int(b) for b in format(i, '06b'))
+            expected = tuple(soclearn.find_local_maximum(state, obj))
+            self.assertEqual(landscape.local_maximum(state), expected)
+            self.assertEqual(soclearn.find_local_maximum(state, landscape), expected)
+
+    def test_memmap(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'landscape.npy')
+            landscape = Landscape.from_objective(obj, num_bits, path=path)
+            landscape.basins
+            landscape.save(path)
+            loaded = Landscape.load(path)
+            self.assertIsInstance(loaded.values, np.memmap)
+            self.assertTrue((loaded.basins == landscape.basins).all())
+            self.assertEqual(loaded.global_maximum()[1], 2**num_bits - 1)
+            del landscape, loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,9 +4,13 @@ import unittest
 import unittest.mock as mock
 
 import networkx as nx
+import numpy as np
 
 import soclearn
+import soclearn.evaluate
 import soclearn.strategy as strategy
+import soclearn.vectorized as vectorized
+from soclearn.adjacency import Adjacency
 
 random_stub_index = 0
 random_stub = [
@@ -112,6 +116,84 @@ class TestLearning(unittest.TestCase):
             individual=True, individual_all_bits=True, individual_mode=soclearn.MODE_FALLBACK)
         self.assertEqual(result.current[-1], next_conform_fallback)
     
+    def test_rng(self):
+        # Individual learning and vectorized steps draw from the given generator
+        for step in (strategy.conform, vectorized.random_neighbor_bit):
+            runs = [
+                soclearn.learn(
+                    G, initial, step, objective=sum, steps=4, individual=True,
+                    individual_all_bits=False, rng=np.random.default_rng(seed))
+                for seed in (1, 1, 2)]
+            self.assertEqual(list(runs[0].current), list(runs[1].current))
+            self.assertNotEqual(list(runs[0].current), list(runs[2].current))
+
+    def test_fixed_point(self):
+        correct = soclearn.evaluate.BeliefsCorrect(true_value)
+        result = soclearn.learn(
+            G, initial, strategy.local_majority, steps=10, reducers=[correct])
+        full = soclearn.learn(
+            G, initial, strategy.local_majority, steps=10, stop_at_fixed_point=False)
+        self.assertIsNotNone(result.converged)
+        self.assertIsNone(full.converged)
+        self.assertEqual(len(result.current), 11)
+        self.assertEqual(len(correct.values), 11)
+        self.assertEqual(list(result.current), list(full.current))
+        converged = result.current[result.converged]
+        self.assertEqual(result.final, converged)
+        if result.converged > 0:
+            self.assertNotEqual(result.current[result.converged - 1], converged)
+    
+    def test_incremental(self):
+        H = nx.barabasi_albert_graph(200, 2, seed=0)
+        rng = random.Random(0)
+        beliefs = dict(
+            (v, tuple(rng.randint(0, 1) for bit in range(6))) for v in H.nodes())
+        for step in (strategy.conform, strategy.local_majority):
+            full = soclearn.learn(H, beliefs, step, steps=20, stop_at_fixed_point=False)
+            result = soclearn.learn(
+                H, beliefs, step, steps=20, stop_at_fixed_point=False, incremental=True)
+            self.assertEqual(list(result.current), list(full.current))
+            self.assertEqual(list(result.social[1:]), list(full.social[1:]))
+    
+    def test_sample_converts_once(self):
+        # Dict steps sample from the adjacency built by learn
+        with mock.patch.object(
+                Adjacency, 'from_edges', wraps=Adjacency.from_edges) as from_edges:
+            result = soclearn.learn(G, initial, strategy.conform, steps=5, sample=2)
+        self.assertEqual(from_edges.call_count, 1)
+        self.assertEqual(len(result.current), 6)
+    
+    def test_critical_fixed_point(self):
+        # Candidates rejected by critical learning are not changes
+        P = nx.path_graph(5)
+        beliefs = {0: (1, 1, 1), 1: (0, 0, 0), 2: (0, 1, 0), 3: (1, 1, 0), 4: (0, 0, 1)}
+        for step in (strategy.conform, vectorized.conform):
+            full = soclearn.learn(
+                P, beliefs, step, objective=sum, critical=True, steps=5,
+                stop_at_fixed_point=False)
+            result = soclearn.learn(
+                P, beliefs, step, objective=sum, critical=True, steps=5)
+            self.assertEqual(result.converged, 1)
+            self.assertEqual(list(result.current), list(full.current))
+            self.assertEqual(list(result.social[1:]), list(full.social[1:]))
+    
+    def test_critical_incremental(self):
+        # Agents keep rejected candidates while outside the frontier
+        H = nx.barabasi_albert_graph(200, 2, seed=0)
+        rng = random.Random(0)
+        beliefs = dict(
+            (v, tuple(rng.randint(0, 1) for bit in range(6))) for v in H.nodes())
+        for step in (strategy.conform, strategy.local_majority):
+            full = soclearn.learn(
+                H, beliefs, step, objective=sum, critical=True, steps=20,
+                stop_at_fixed_point=False)
+            result = soclearn.learn(
+                H, beliefs, step, objective=sum, critical=True, steps=20,
+                incremental=True)
+            self.assertIsNotNone(result.converged)
+            self.assertEqual(list(result.current), list(full.current))
+            self.assertEqual(list(result.social[1:]), list(full.social[1:]))
+    
 
     
 if __name__ == '__main__':
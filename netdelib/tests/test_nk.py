@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from soclearn.learn import find_local_maximum
+from soclearn.models.nk import NK
+
+
+class TestNK(unittest.TestCase):
+
+    def setUp(self):
+        self.model = NK(6, 2, 3, rng=np.random.RandomState(0))
+
+    def test_get_value(self):
+        state = (1, 0, 0, 1, 1, 0)
+        contributions = []
+        for i in range(6):
+            index = 0
+            for j in self.model.interactions[i]:
+                index = 2 * index + state[j]
+            contributions.append(self.model.contributions[i, index])
+        self.assertAlmostEqual(self.model.get_value(state), np.mean(contributions)**3)
+
+    def test_evaluate_many(self):
+        matrix = np.random.RandomState(1).randint(0, 2, (20, 6))
+        values = self.model.evaluate_many(matrix)
+        expected = [self.model.get_value(tuple(row)) for row in matrix]
+        self.assertTrue(np.allclose(values, expected))
+
+    def test_maxima(self):
+        maxima = self.model.get_state_maxima_map()
+        self.assertEqual(len(maxima), 2**6)
+        objective = lambda belief: self.model.get_value(belief)
+        for state in [(0,) * 6, (1, 0, 1, 0, 1, 0)]:
+            self.assertEqual(maxima[state], tuple(find_local_maximum(state, objective)))
+        state, value = self.model.get_global_max()
+        self.assertEqual(maxima[state], state)
+
+
+if __name__ == '__main__':
+    unittest.main()
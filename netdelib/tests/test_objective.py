@@ -0,0 +1,63 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+
+import soclearn
+from soclearn import strategy
+from soclearn.objective import CachedObjective
+from soclearn.state import encode, decode, encode_belief, decode_belief
+
+true_value = [1, 0, 1, 0, 1, 0]
+
+def obj(x):
+    return sum(1 for i, v in enumerate(true_value) if x[i] == v)
+
+class TestObjective(unittest.TestCase):
+
+    def test_encode(self):
+        self.assertEqual(encode_belief((1, 0, 1, 1)), 11)
+        self.assertEqual(decode_belief(11, 4), (1, 0, 1, 1))
+        matrix = np.array([[1, 0, 1, 1], [0, 0, 0, 1]], dtype=np.uint8)
+        self.assertEqual(list(encode(matrix)), [11, 1])
+        self.assertTrue((decode(encode(matrix), 4) == matrix).all())
+
+    def test_lru(self):
+        cached = CachedObjective(obj, maxsize=2)
+        self.assertEqual(cached((1, 0, 1, 0, 1, 0)), 6)
+        self.assertEqual(cached((1, 0, 1, 0, 1, 0)), 6)
+        self.assertEqual(cached((0, 0, 1, 0, 1, 0)), 5)
+        self.assertEqual(cached((0, 1, 1, 0, 1, 0)), 4)
+        info = cached.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 3, 2))
+        # Least recently used value was evicted
+        cached((1, 0, 1, 0, 1, 0))
+        self.assertEqual(cached.misses, 4)
+
+    def test_dense(self):
+        cached = CachedObjective(obj, num_bits=6)
+        matrix = np.array([[1, 0, 1, 0, 1, 0], [0, 0, 1, 0, 1, 0], [1, 0, 1, 0, 1, 0]])
+        self.assertEqual(list(cached.evaluate_many(matrix)), [6, 5, 6])
+        self.assertEqual((cached.hits, cached.misses), (1, 2))
+        self.assertEqual(cached((0, 0, 1, 0, 1, 0)), 5)
+        self.assertEqual(cached.cache_info().currsize, 2)
+
+    def test_learn(self):
+        G = nx.path_graph(4)
+        initial = {
+            0: [1, 0, 1, 0, 1, 0],
+            1: [0, 0, 0, 0, 0, 0],
+            2: [0, 1, 1, 0, 1, 0],
+            3: [1, 1, 1, 1, 1, 1]
+        }
+        cached = CachedObjective(obj, num_bits=6)
+        result = soclearn.learn(
+            G, initial, strategy.best_neighbor, objective=cached, steps=3, critical=True)
+        expected = soclearn.learn(
+            G, initial, strategy.best_neighbor, objective=obj, steps=3, critical=True)
+        self.assertEqual(result.current[-1], expected.current[-1])
+        self.assertGreater(cached.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+
+import unittest
+
+import numpy as np
+
+from topologies import factories
+from topologies import pool as tppool
+
+N = 24
+M = 4
+
+def edge_lists(graphs):
+    return [(graph.indptr.tolist(), graph.indices.tolist()) for graph in graphs]
+
+class TestGraphPool(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        tppool._loaded.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        tppool._loaded.clear()
+
+    def create_pool(self, seed=1, size=3):
+        return tppool.GraphPool(factories.RandomFactory(N, M, 0.2), size, self.path, seed=seed)
+
+    def test_round_trip(self):
+        pool = self.create_pool()
+        self.assertFalse(pool.exists())
+        pool.generate(processes=1)
+        self.assertTrue(pool.exists())
+        generated = edge_lists(pool.load())
+        # A new process would read the file
+        tppool._loaded.clear()
+        loaded = self.create_pool()
+        self.assertEqual(edge_lists(loaded.load()), generated)
+        for run in range(5):
+            factory = loaded.factory(run)
+            adjacency = factory.create_adjacency(0)
+            self.assertIs(adjacency, loaded.get(run))
+            self.assertIs(factory.create_adjacency(1), adjacency)
+            self.assertEqual(edge_lists([adjacency]), [generated[run % 3]])
+            self.assertEqual(
+                set(factory.create(0).edges()), set(adjacency.to_graph().edges()))
+
+    def test_seed(self):
+        first = self.create_pool(seed=1)
+        first.generate(processes=1)
+        same = edge_lists(first.load())
+        os.remove(first.filename)
+        tppool._loaded.clear()
+        again = self.create_pool(seed=1)
+        again.generate(processes=1)
+        self.assertEqual(edge_lists(again.load()), same)
+        other = self.create_pool(seed=2)
+        self.assertNotEqual(other.filename, first.filename)
+        other.generate(processes=1)
+        self.assertNotEqual(edge_lists(other.load()), same)
+
+    def test_loaded_cache(self):
+        pool = self.create_pool()
+        pool.generate(processes=1)
+        tppool._loaded.clear()
+        graphs = self.create_pool().load()
+        # Pools for the same file share the adjacencies read first
+        os.remove(pool.filename)
+        self.assertIs(self.create_pool().load(), graphs)
+        self.assertIs(self.create_pool().get(1), graphs[1])
+
+    def test_stage_graphs_rejected(self):
+        with self.assertRaises(ValueError):
+            tppool.GraphPool(factories.LongPathFactory(N, M), 3, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import configparser
+import os
+import sys
+
+import unittest
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# runner uses package-relative imports, so it is imported as netdelib.runner
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from netdelib import runner
+from netdelib.soclearn import shared as runner_shared
+
+def make_config():
+    config = configparser.ConfigParser()
+    config.read_dict({
+        'abm': {
+            'N': '20', 'M': '4', 'stages': '2', 'steps': '3',
+            'bit_count': '4', 'p_error': '0.3', 'runs': '4'},
+        'networks': {
+            'enabled': 'Random Group,Small World',
+            'small_world_k': '4', 'small_world_a': '0.2'},
+        'strategies': {
+            'enabled': 'Conform,Random Neighbor Bit', 'individual': 'true'},
+    })
+    return config
+
+def shared_trial(run, config, objects):
+    # Rows of the published matrix, and the shared memory blocks attached here
+    return objects['beliefs'][run].tolist(), sorted(runner_shared._attached)
+
+class TestRunner(unittest.TestCase):
+
+    def test_processes(self):
+        # Trials are seeded by run, not by worker
+        config = make_config()
+        single = runner.collect_trials(config, runs=4, seed=3, processes=1)
+        parallel = runner.collect_trials(config, runs=4, seed=3, processes=2)
+        self.assertEqual(len(single), 4)
+        for first, second in zip(single, parallel):
+            self.assertEqual(set(first), set(second))
+            for key in first:
+                for metric in ('correct', 'distance'):
+                    self.assertTrue(np.allclose(first[key][metric], second[key][metric]))
+
+    def test_shared(self):
+        config = make_config()
+        beliefs = np.arange(12, dtype=np.uint8).reshape(4, 3)
+        for processes in (1, 2):
+            results = runner.collect_trials(
+                config, shared_trial, runs=4, seed=0, processes=processes,
+                shared={'beliefs': beliefs})
+            self.assertEqual([rows for rows, names in results], beliefs.tolist())
+            # The published memory is unlinked when the sweep ends
+            names = set(name for rows, block_names in results for name in block_names)
+            self.assertTrue(names)
+            for name in names:
+                with self.assertRaises(FileNotFoundError):
+                    shared_memory.SharedMemory(name=name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from soclearn import shared
+from soclearn.adjacency import Adjacency
+from soclearn.landscape import Landscape
+
+
+class TestShared(unittest.TestCase):
+
+    def test_attach(self):
+        landscape = Landscape(np.arange(16, dtype=np.float32))
+        adjacency = Adjacency.from_groups([0, 0, 1, 1, 1])
+        beliefs = np.eye(4, dtype=np.uint8)
+        with shared.SharedArrays() as arrays:
+            arrays.publish('landscape', landscape)
+            arrays.publish('graph', adjacency)
+            arrays.publish('beliefs', beliefs)
+            objects = shared.attach(arrays.handles())
+            self.assertTrue((objects['landscape'].values == landscape.values).all())
+            self.assertEqual(objects['landscape']([1, 0, 0, 1]), 9.0)
+            self.assertTrue((objects['graph'].indices == adjacency.indices).all())
+            self.assertTrue((objects['graph'].groups == adjacency.groups).all())
+            self.assertTrue((objects['beliefs'] == beliefs).all())
+            self.assertFalse(objects['beliefs'].flags.writeable)
+            del objects
+            shared.detach()
+
+
+if __name__ == '__main__':
+    unittest.main()
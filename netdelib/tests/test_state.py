@@ -0,0 +1,73 @@
+import pickle
+
+import unittest
+
+import numpy as np
+
+from soclearn.state import BeliefState, BeliefHistory
+from soclearn.state import belief_keys, decode_words, encode, encode_words
+
+initial = {
+    0: [0, 0, 1, 0, 1, 0, 1, 1, 0],
+    1: [1, 1, 1, 0, 1, 0, 0, 0, 1],
+    2: [1, 0, 0, 0, 1, 0, 1, 1, 1],
+}
+
+initial_tuples = dict((k, tuple(v)) for k, v in initial.items())
+
+class TestState(unittest.TestCase):
+
+    def test_from_dict(self):
+        state = BeliefState.from_dict(initial)
+        self.assertEqual(state.matrix.shape, (3, 9))
+        self.assertEqual(state.matrix.dtype, np.uint8)
+        self.assertEqual(state[1], initial_tuples[1])
+        self.assertEqual(state, initial_tuples)
+        self.assertEqual(state.to_dict(), initial_tuples)
+
+    def test_pack(self):
+        state = BeliefState.from_dict(initial)
+        packed = state.pack()
+        self.assertEqual(packed.shape, (3, 2))
+        unpacked = BeliefState.unpack(packed, state.nodes, state.num_bits)
+        self.assertEqual(unpacked, initial_tuples)
+
+    def test_history(self):
+        state = BeliefState.from_dict(initial)
+        history = BeliefHistory(state.nodes, state.num_bits, [state, None])
+        history.append(initial)
+        self.assertEqual(len(history), 3)
+        self.assertIsNone(history[1])
+        self.assertEqual(history[-1], initial_tuples)
+        tail = BeliefHistory(state.nodes, state.num_bits, [None, state])
+        history += tail[1:]
+        self.assertEqual(len(history), 4)
+        self.assertEqual(list(history)[3], initial_tuples)
+        restored = pickle.loads(pickle.dumps(history))
+        self.assertEqual(restored[0], initial_tuples)
+
+class TestEncode(unittest.TestCase):
+
+    def test_encode_words(self):
+        rng = np.random.RandomState(1)
+        matrix = rng.randint(0, 2, (20, 130)).astype(np.uint8)
+        words = encode_words(matrix)
+        self.assertEqual(words.shape, (20, 3))
+        self.assertTrue((words[:, 0] == encode(matrix[:, :64])).all())
+        self.assertTrue((decode_words(words, 130) == matrix).all())
+
+    def test_belief_keys(self):
+        rng = np.random.RandomState(2)
+        for num_bits in (5, 100):
+            matrix = rng.randint(0, 2, (50, num_bits)).astype(np.uint8)
+            matrix[7] = matrix[3]
+            keys = belief_keys(matrix)
+            self.assertEqual(keys[7], keys[3])
+            # Keys sort in the same order as rows
+            expected = np.unique(matrix, axis=0, return_inverse=True)[1]
+            ids = np.unique(keys, return_inverse=True)[1]
+            self.assertTrue((ids.reshape(-1) == expected.reshape(-1)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -216,7 +216,19 @@ class TestLearning(unittest.TestCase):
     def test_conform(self):
         next = strategy.conform(G, initial)
         self.assertEqual(next, next_conform)
-    
+
+    def test_conform_ties(self):
+        # Nodes 0-2 see ties, nodes 3 and 4 a unique mode, node 5 no neighbors
+        H = nx.Graph([(0, 1), (0, 2), (4, 1), (4, 2), (4, 3)])
+        H.add_node(5)
+        beliefs = {0: (0, 0), 1: (0, 1), 2: (1, 0), 3: (0, 1), 4: (1, 1), 5: (1, 1)}
+        next = strategy.conform(H, beliefs)
+        self.assertEqual(next, {
+            0: (0, 0), 1: (0, 1), 2: (1, 0), 3: (1, 1), 4: (0, 1), 5: (1, 1)})
+        self.assertEqual(strategy.agent_conform((1, 1), [(0, 1), (1, 0)]), (1, 1))
+        self.assertEqual(strategy.agent_conform((1, 1), []), (1, 1))
+        self.assertEqual(strategy.agent_conform((1, 1), [(0, 1), (1, 0), (0, 1)]), (0, 1))
+
     def test_random_neighbor_bit(self):
         with mock.patch('soclearn.strategy.random.choice', mock_choice):
             next = strategy.random_neighbor_bit(G, initial)
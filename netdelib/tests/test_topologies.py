@@ -0,0 +1,48 @@
+import random
+
+import unittest
+
+from topologies import topologies as topo
+
+def reference_long_path_groups(N, M, stage, lowest=2):
+    # List-based construction of long-path groups
+    modulus = list(topo.LONG_PATH_MODULI)
+    if lowest is not None and lowest > 1:
+        modulus = [1] + [x for x in modulus if x >= lowest]
+    num_groups = int(N / M)
+    num_moduli = [i for i, m in enumerate(modulus) if m > num_groups][0]
+    stage = stage % num_moduli
+    m = 1 if stage == 0 else modulus[stage]
+    partition = []
+    for j in range(m):
+        residue_class = [n for n in range(N) if n % m == j]
+        partition += [
+            set(residue_class[k:k+M])
+            for k in range(0, len(residue_class), M)]
+    return partition
+
+class TestTopologies(unittest.TestCase):
+
+    def test_long_path_ids(self):
+        for N, M, lowest in [(30, 3, 2), (64, 4, 2), (100, 5, 5), (37, 4, 3), (200, 7, 2)]:
+            for stage in range(12):
+                expected = reference_long_path_groups(N, M, stage, lowest)
+                ids = topo.get_long_path_stage_group_ids(N, M, stage, lowest)
+                self.assertEqual(
+                    topo.get_long_path_stage_groups(N, M, stage, lowest), expected)
+                for k, group in enumerate(expected):
+                    for n in group:
+                        self.assertEqual(ids[n], k)
+
+    def test_random_ids(self):
+        N, M = 30, 4
+        for stage in range(3):
+            random.seed(stage)
+            expected = topo.get_random_stage_groups(N, M, stage)
+            random.seed(stage)
+            ids = topo.get_random_stage_group_ids(N, M, stage)
+            self.assertEqual(topo.ids_to_groups(ids), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+import unittest
+
+import networkx as nx
+
+import soclearn
+from soclearn import strategy
+from soclearn.discrete import run_discrete
+from soclearn.result import RunResult
+
+G = nx.Graph()
+G.add_edges_from([
+    (0, 1), (0, 2), (0, 3), (0, 4),
+    (7, 3), (7, 4), (7, 5), (7, 6)
+])
+
+true_value = [1, 0, 1, 0, 1, 0, 1, 0, 1]
+
+initial = {
+    0: [0, 0, 1, 0, 1, 0, 1, 1, 1],
+    1: [1, 1, 1, 0, 1, 0, 0, 0, 1],
+    2: [1, 0, 0, 0, 1, 0, 1, 1, 0],
+    3: [1, 0, 1, 1, 1, 0, 0, 0, 1],
+    4: [1, 0, 1, 0, 0, 0, 1, 0, 1],
+    5: [1, 0, 1, 0, 1, 1, 0, 1, 1],
+    6: [1, 0, 1, 0, 1, 1, 1, 1, 1],
+    7: [1, 0, 1, 0, 1, 0, 0, 0, 0]
+}
+
+def obj(x):
+    return sum(1 for i, v in enumerate(true_value) if x[i] == v)
+
+class StaticFactory(object):
+    stage_graphs = False
+    def create(self, stage):
+        return G
+
+class TestTrajectory(unittest.TestCase):
+
+    def test_save_load(self):
+        result = soclearn.learn(
+            G, initial, strategy.best_neighbor, objective=obj, steps=3,
+            individual=True, individual_mode=soclearn.MODE_BEST)
+        with tempfile.TemporaryDirectory() as path:
+            result.save(path)
+            loaded = RunResult.load(path)
+            self.assertEqual(len(loaded.current), 4)
+            self.assertIsNone(loaded.social[0])
+            for t in range(4):
+                self.assertEqual(loaded.current[t], result.current[t])
+                self.assertEqual(loaded.individual[t], result.individual[t])
+            self.assertEqual(loaded.current.bits().shape, (4, 8, 2))
+            agent = loaded.current.agent(2)
+            self.assertEqual(tuple(agent[-1]), result.current[-1][2])
+
+    def test_run_discrete(self):
+        expected = run_discrete(
+            StaticFactory(), strategy.local_majority, initial, obj, 8, 4, 3, 2)
+        with tempfile.TemporaryDirectory() as path:
+            result = run_discrete(
+                StaticFactory(), strategy.local_majority, initial, obj, 8, 4, 3, 2,
+                path=path)
+            self.assertEqual(len(result.current), 7)
+            self.assertEqual(os.path.getsize(os.path.join(path, 'current.mask')), 7)
+            loaded = RunResult.load(path)
+            self.assertEqual(list(loaded.current), list(expected.current))
+            self.assertEqual(loaded.final, expected.final)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+
+import soclearn
+from soclearn import strategy
+from soclearn import vectorized
+from soclearn.adjacency import Adjacency
+from soclearn.state import BeliefState
+
+G = nx.Graph()
+G.add_edges_from([
+    (0, 1), (0, 2), (0, 3), (0, 4),
+    (7, 3), (7, 4), (7, 5), (7, 6)
+])
+
+true_value = [1, 0, 1, 0, 1, 0]
+
+initial = {
+    0: [0, 0, 1, 0, 1, 0],
+    1: [1, 1, 1, 0, 1, 0],
+    2: [1, 0, 0, 0, 1, 0],
+    3: [1, 0, 1, 1, 1, 0],
+    4: [1, 0, 1, 0, 0, 0],
+    5: [1, 0, 1, 0, 1, 1],
+    6: [1, 0, 1, 0, 1, 1],
+    7: [1, 0, 1, 0, 1, 0]
+}
+
+def obj(x):
+    return sum(1 for i, v in enumerate(true_value) if x[i] == v)
+
+def allowed_bits(v, bit):
+    return set([initial[v][bit]] + [initial[w][bit] for w in G.neighbors(v)])
+
+class TestVectorized(unittest.TestCase):
+
+    def setUp(self):
+        self.state = BeliefState.from_dict(initial)
+        self.adjacency = Adjacency.from_graph(G, self.state.nodes)
+
+    def run_step(self, step, **kwargs):
+        matrix = step(self.adjacency, self.state.matrix, **kwargs)
+        return self.state.replace(matrix).to_dict()
+
+    def test_adjacency(self):
+        self.assertEqual(list(self.adjacency.degree()), [4, 1, 1, 2, 2, 1, 1, 4])
+        for v in G.nodes():
+            self.assertEqual(sorted(self.adjacency.neighbors(v)), sorted(G.neighbors(v)))
+
+    def test_sample(self):
+        sampled = self.adjacency.sample(2)
+        self.assertEqual(list(sampled.degree()), [2, 1, 1, 2, 2, 1, 1, 2])
+        for v in G.nodes():
+            self.assertTrue(set(sampled.neighbors(v)) <= set(G.neighbors(v)))
+
+    def test_sample_matrix(self):
+        sampled = self.adjacency.sample_matrix(2)
+        self.assertEqual(sampled.shape, (8, 2))
+        self.assertEqual(list((sampled >= 0).sum(axis=1)), [2, 1, 1, 2, 2, 1, 1, 2])
+        for i, row in enumerate(sampled):
+            chosen = [j for j in row if j >= 0]
+            self.assertEqual(len(set(chosen)), len(chosen))
+            self.assertTrue(set(chosen) <= set(self.adjacency.neighbors(i)))
+
+    def test_sample_neighbors(self):
+        sampled = strategy.sample_neighbors(G, 3)
+        for v in G.nodes():
+            self.assertEqual(len(sampled[v]), min(3, G.degree(v)))
+            self.assertTrue(set(sampled[v]) <= set(G.neighbors(v)))
+
+    def test_conform(self):
+        self.assertEqual(
+            self.run_step(vectorized.conform), strategy.conform(G, initial))
+
+    def test_local_majority(self):
+        self.assertEqual(
+            self.run_step(vectorized.local_majority), strategy.local_majority(G, initial))
+
+    def test_best_neighbor(self):
+        self.assertEqual(
+            self.run_step(vectorized.best_neighbor, objective=obj),
+            strategy.best_neighbor(G, initial, obj))
+
+    def test_random_neighbor_bit(self):
+        result = self.run_step(vectorized.random_neighbor_bit)
+        for v, belief in result.items():
+            for bit, value in enumerate(belief):
+                self.assertIn(value, allowed_bits(v, bit))
+
+    def test_random_neighbor_list(self):
+        result = self.run_step(vectorized.random_neighbor_list)
+        for v, belief in result.items():
+            allowed = [tuple(initial[w]) for w in list(G.neighbors(v)) + [v]]
+            self.assertIn(belief, allowed)
+
+    def test_confident_neighbor(self):
+        # Nodes 0 and 7 are the only candidates for their neighbors
+        result = self.run_step(vectorized.confident_neighbor, objective=obj)
+        self.assertEqual(result[1], tuple(initial[0]))
+        self.assertEqual(result[5], tuple(initial[7]))
+        self.assertIn(result[3], [tuple(initial[0]), tuple(initial[7])])
+
+    def test_learn(self):
+        result = soclearn.learn(G, initial, vectorized.local_majority, steps=3)
+        expected = soclearn.learn(G, initial, strategy.local_majority, steps=3)
+        self.assertEqual(result.current[-1], expected.current[-1])
+
+class TestIndividual(unittest.TestCase):
+
+    def setUp(self):
+        self.state = BeliefState.from_dict(initial)
+
+    def test_individual(self):
+        result = vectorized.individual(None, self.state.matrix, obj)
+        for i, v in enumerate(self.state.nodes):
+            before = obj(initial[v])
+            after = obj(tuple(result[i]))
+            # Every agent short of the true value can improve by one bit
+            if before < len(true_value):
+                self.assertEqual(after, before + 1)
+            else:
+                self.assertEqual(tuple(result[i]), tuple(initial[v]))
+            self.assertLessEqual(int((result[i] != self.state.matrix[i]).sum()), 1)
+
+    def test_individual_bit(self):
+        result = vectorized.individual_bit(None, self.state.matrix, obj)
+        for i, v in enumerate(self.state.nodes):
+            self.assertGreaterEqual(obj(tuple(result[i])), obj(initial[v]))
+            self.assertLessEqual(int((result[i] != self.state.matrix[i]).sum()), 1)
+
+    def test_local_maximum(self):
+        maxima = vectorized.local_maximum(self.state.matrix, obj)
+        self.assertTrue((maxima == np.array(true_value)).all())
+
+class TestGroups(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.matrix = rng.randint(0, 2, (60, 3)).astype(np.uint8)
+        # Groups of different sizes, including a single member group
+        groups = np.repeat(np.arange(12), [1, 2, 3, 4, 5, 6, 7, 8, 9, 5, 5, 5])
+        self.groups = rng.permutation(groups)
+        self.adjacency = Adjacency.from_groups(self.groups)
+        # Same graph without group ids, uses per-row reductions
+        self.plain = Adjacency(self.adjacency.indptr, self.adjacency.indices)
+
+    def test_conform(self):
+        result = vectorized.conform(self.adjacency, self.matrix)
+        expected = vectorized.conform(self.plain, self.matrix)
+        self.assertTrue((result == expected).all())
+
+    def test_local_majority(self):
+        result = vectorized.local_majority(self.adjacency, self.matrix)
+        expected = vectorized.local_majority(self.plain, self.matrix)
+        self.assertTrue((result == expected).all())
+
+    def test_best_neighbor(self):
+        result = vectorized.best_neighbor(self.adjacency, self.matrix, obj3)
+        values = [obj3(row) for row in result]
+        expected = vectorized.best_neighbor(self.plain, self.matrix, obj3)
+        self.assertEqual(values, [obj3(row) for row in expected])
+
+def obj3(x):
+    return int(x[0]) + 2 * int(x[1]) * int(x[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,22 @@
+import abc
+import itertools
+
 import networkx as nx
+from . import generators as gen
 from . import topologies as topo
+try:
+    from ..soclearn.adjacency import Adjacency
+except ImportError:
+    # Imported as the top-level package topologies, with netdelib/ on the path
+    from soclearn.adjacency import Adjacency
+
+def clique_union(groups):
+    """Create a networkx Graph that is a disjoint union of cliques."""
+    G = nx.Graph()
+    for group in groups:
+        G.add_nodes_from(group)
+        G.add_edges_from(itertools.combinations(group, 2))
+    return G
 
 class NetworkFactory(object):
     """Base class for network factories.
@@ -25,26 +42,70 @@ class NetworkFactory(object):
         A networkx Graph.
         """
         return nx.Graph()
+    
+    def create_csr(self, stage, rng=None):
+        """Create a soclearn.adjacency.Adjacency with rows for nodes 0 to N - 1,
+        sampling edges directly into CSR arrays where the factory supports it.
+        
+        The default converts the networkx Graph from create().
+        
+        Parameters
+        stage: The deliberation stage
+        rng: (optional) source of random numbers, numpy.random or a numpy
+            Generator. Defaults to numpy.random.
+        """
+        return Adjacency.from_graph(self.create(stage), list(range(self.N)))
+    
+    def create_adjacency(self, stage):
+        """Create a soclearn.adjacency.Adjacency with rows for nodes 0 to N - 1.
+        
+        Parameters
+        stage: The deliberation stage
+        """
+        return self.create_csr(stage)
 
-class LongPathFactory(NetworkFactory):
-    '''Factory class for long-path networks.'''
+class GroupFactory(NetworkFactory, abc.ABC):
+    """Base class for networks that are a disjoint union of cliques (groups).
+    
+    Subclasses implement create_groups(), returning the group id of each
+    participant. Graphs and adjacencies are built from the group ids.
+    """
+    
+    @abc.abstractmethod
+    def create_groups(self, stage):
+        """Find the group membership of each participant.
+        
+        Parameters
+        stage: The deliberation stage
+        
+        Returns
+        An array of N group ids.
+        """
+    
     def create(self, stage):
-        groups = topo.get_long_path_stage_groups(self.N, self.M, stage)
-        G = nx.Graph()
-        for group in groups:
-            g = nx.complete_graph(group) #clique network
-            G = nx.union(G, g)
-        return G
-    
-class RandomGroupFactory(NetworkFactory):
+        groups = self.create_groups(stage)
+        members = {}
+        for v, group in enumerate(groups.tolist()):
+            members.setdefault(group, []).append(v)
+        return clique_union(members.values())
+    
+    def create_csr(self, stage, rng=None):
+        """Create an Adjacency directly from group ids, without networkx.
+        
+        The group ids are available as the `groups` attribute of the result.
+        Group ids are drawn by create_groups(), so rng is unused.
+        """
+        return Adjacency.from_groups(self.create_groups(stage))
+
+class LongPathFactory(GroupFactory):
+    '''Factory class for long-path networks.'''
+    def create_groups(self, stage):
+        return topo.get_long_path_stage_group_ids(self.N, self.M, stage)
+    
+class RandomGroupFactory(GroupFactory):
     """Factory class for random group networks."""
-    def create(self, stage):
-        groups = topo.get_random_stage_groups(self.N, self.M, stage)
-        G = nx.Graph()
-        for group in groups:
-            g = nx.complete_graph(group) #clique network
-            G = nx.union(G, g)
-        return G
+    def create_groups(self, stage):
+        return topo.get_random_stage_group_ids(self.N, self.M, stage)
 
 class CompleteFactory(NetworkFactory):
     """Factory class for deliberation network with random group assignments."""
@@ -54,6 +115,9 @@ class CompleteFactory(NetworkFactory):
         
     def create(self, stage):
         return nx.complete_graph(self.N)
+    
+    def create_csr(self, stage, rng=None):
+        return gen.complete(self.N)
 
 class PreferentialFactory(NetworkFactory):
     """Factory class for preferential attachment networks.
@@ -70,6 +134,9 @@ class PreferentialFactory(NetworkFactory):
     def create(self, stage):
         return nx.barabasi_albert_graph(self.N, self.m)
     
+    def create_csr(self, stage, rng=None):
+        return gen.preferential_attachment(self.N, self.m, rng)
+    
 class SmallWorldFactory(NetworkFactory):
     """Factory class for small-world networks.
     
@@ -88,6 +155,9 @@ class SmallWorldFactory(NetworkFactory):
     def create(self, stage):
         return nx.watts_strogatz_graph(self.N, self.k, self.a)
     
+    def create_csr(self, stage, rng=None):
+        return gen.watts_strogatz(self.N, self.k, self.a, rng)
+    
 class RandomFactory(NetworkFactory):
     """Factory class for Erdos-Renyi random networks.
     
@@ -103,6 +173,9 @@ class RandomFactory(NetworkFactory):
         
     def create(self, stage):
         return nx.erdos_renyi_graph(self.N, self.p)
+    
+    def create_csr(self, stage, rng=None):
+        return gen.erdos_renyi(self.N, self.p, rng)
 
 class LFRFactory(NetworkFactory):
     """Factory class for LFR networks.
@@ -137,10 +210,15 @@ class StochasticBlockFactory(NetworkFactory):
     def __init__(self, N, M):
         super(StochasticBlockFactory, self).__init__(N, M, False)
     
-    def create(self, stage):
+    def densities(self):
+        """Return a tuple (number of blocks, within density, between density)."""
         num_blocks = int(self.N / self.M)
         within_density = (self.M - 2) / self.M
         between_density = 1 / (self.N - self.M)
+        return num_blocks, within_density, between_density
+    
+    def create(self, stage):
+        num_blocks, within_density, between_density = self.densities()
         sizes = [self.M for i in range(num_blocks)]
         density = [[
                 within_density if s == r else between_density
@@ -149,4 +227,9 @@ class StochasticBlockFactory(NetworkFactory):
         ]
         return nx.stochastic_block_model(sizes, density)
     
+    def create_csr(self, stage, rng=None):
+        num_blocks, within_density, between_density = self.densities()
+        return gen.planted_partition(
+            self.N, num_blocks, self.M, within_density, between_density, rng)
+    
     
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""Random graph generators sampling edges directly into CSR arrays.
+
+Each generator returns a soclearn.adjacency.Adjacency with rows for nodes
+0 to N - 1, drawing from the same distribution as the networkx generator
+used by the corresponding factory in factories.py, without building a
+networkx Graph. Random numbers come from `rng`, numpy.random or a numpy
+Generator.
+"""
+import numpy as np
+from numpy import random as nprand
+
+try:
+    from ..soclearn.adjacency import Adjacency
+except ImportError:
+    # Imported as the top-level package topologies, with netdelib/ on the path
+    from soclearn.adjacency import Adjacency
+
+# Number of edges sampled at once by skip sampling
+CHUNK_SIZE = 2**20
+
+def edges_to_adjacency(u, v, N):
+    """Create an Adjacency from arrays of undirected edges (u[i], v[i]).
+
+    Self-loops are dropped and repeated edges are merged.
+    """
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    keep = u != v
+    if not keep.any():
+        return Adjacency(np.zeros(N + 1, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    low = np.minimum(u[keep], v[keep])
+    high = np.maximum(u[keep], v[keep])
+    # Sorted (row, col) keys for both directions of each edge, without
+    # repeats. Sorting is faster than np.unique for many distinct keys.
+    keys = np.sort(np.concatenate([low * N + high, high * N + low]))
+    keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+    rows, cols = keys // N, keys % N
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=N))])
+    return Adjacency(indptr, cols)
+
+def skip_sample(num_pairs, p, rng):
+    """Choose each of num_pairs indices independently with probability p.
+
+    Gaps between chosen indices are drawn from a geometric distribution, so
+    work is proportional to the number of chosen indices.
+
+    # Return value
+    A sorted int64 array of chosen indices in [0, num_pairs).
+    """
+    if p <= 0 or num_pairs <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(num_pairs, dtype=np.int64)
+    chunks = []
+    position = -1
+    chunk_size = int(min(CHUNK_SIZE, num_pairs * p * 1.1 + 100))
+    while position < num_pairs:
+        chosen = position + np.cumsum(rng.geometric(p, size=chunk_size))
+        chunks.append(chosen[chosen < num_pairs])
+        position = chosen[-1]
+    return np.concatenate(chunks)
+
+def pair_index_to_nodes(k):
+    """Map indices of pairs (i, j), j < i, in lexicographic order to nodes.
+
+    Pair (i, j) has index i * (i - 1) / 2 + j.
+
+    # Return value
+    A tuple of arrays (i, j).
+    """
+    k = np.asarray(k, dtype=np.int64)
+    i = ((1 + np.sqrt(1 + 8 * k.astype(np.float64))) / 2).astype(np.int64)
+    # Correct rounding errors in the square root
+    i -= (i * (i - 1) // 2 > k)
+    i += ((i + 1) * i // 2 <= k)
+    j = k - i * (i - 1) // 2
+    return i, j
+
+def erdos_renyi(N, p, rng=None):
+    """Erdos-Renyi G(N, p) graph, as nx.erdos_renyi_graph(N, p)."""
+    if rng is None:
+        rng = nprand
+    i, j = pair_index_to_nodes(skip_sample(N * (N - 1) // 2, p, rng))
+    return edges_to_adjacency(i, j, N)
+
+def planted_partition(N, num_blocks, size, p_in, p_out, rng=None):
+    """Stochastic block model with num_blocks blocks of equal size.
+
+    Pairs within a block are connected with probability p_in, other pairs
+    with probability p_out. Nodes beyond num_blocks * size have no edges,
+    as in nx.stochastic_block_model with a density matrix of p_in on the
+    diagonal and p_out elsewhere.
+    """
+    if rng is None:
+        rng = nprand
+    # Pairs within blocks, indexed block by block
+    block_pairs = size * (size - 1) // 2
+    chosen = skip_sample(num_blocks * block_pairs, p_in, rng)
+    block = chosen // block_pairs
+    i, j = pair_index_to_nodes(chosen % block_pairs)
+    within_u, within_v = block * size + i, block * size + j
+    # Pairs between blocks, sampled among all pairs then dropping pairs
+    # within a block, which are independent of the rest
+    num_nodes = num_blocks * size
+    i, j = pair_index_to_nodes(skip_sample(num_nodes * (num_nodes - 1) // 2, p_out, rng))
+    between = i // size != j // size
+    return edges_to_adjacency(
+        np.concatenate([within_u, i[between]]),
+        np.concatenate([within_v, j[between]]),
+        N)
+
+def distinct_prefix(values, m):
+    """Find the first m distinct values of each row.
+
+    Values are node ids, -1 for values not known yet, or -2 past the end of
+    a row.
+
+    # Return value
+    A tuple (ready, selected, short): ready marks rows whose first m distinct
+    values come before any unknown value, selected marks those values, and
+    short marks rows ending with fewer than m distinct values and no
+    unknown value.
+    """
+    num_rows, length = values.shape
+    known = values >= 0
+    # Rows are short, so compare each value with the values before it
+    new = known.copy()
+    for j in range(1, length):
+        new[:, j] &= (values[:, :j] != values[:, j, None]).all(axis=1)
+    count = np.cumsum(new, axis=1)
+    unknown = np.cumsum(values == -1, axis=1)
+    complete = count[:, -1] >= m
+    position = np.argmax(count >= m, axis=1)
+    ready = complete & (unknown[np.arange(num_rows), position] == 0)
+    selected = new & (count <= m) & ready[:, None]
+    short = ~complete & (unknown[:, -1] == 0)
+    return ready, selected, short
+
+def _attach_chunk(nodes, m, source, target, rng):
+    """Choose the targets of nodes, whose edges are added in order.
+
+    Endpoint r of the list (source[0], target[0], source[1], ...) is chosen
+    among the endpoints of edges added before the new node. Each node has
+    its own sequence of draws, NaN past its end, doubled while it has too
+    few distinct targets.
+    """
+    first_edge = m + (nodes - m - 1) * m
+    draws = rng.random((len(nodes), m))
+    while len(nodes) > 0:
+        drawn = ~np.isnan(draws)
+        ends = 2 * first_edge[:, None]
+        r = np.minimum((np.where(drawn, draws, 0) * ends).astype(np.int64), ends - 1)
+        chosen = np.where(r % 2 == 0, source[r // 2], target[r // 2])
+        chosen[~drawn] = -2
+        # Only rows with m values before the first unknown one can be ready
+        unknown = chosen == -1
+        candidates = np.where(unknown.any(axis=1), np.argmax(unknown, axis=1), m) >= m
+        ready = np.zeros(len(nodes), dtype=bool)
+        short = np.zeros(len(nodes), dtype=bool)
+        ready[candidates], selected, short[candidates] = distinct_prefix(chosen[candidates], m)
+        edges = first_edge[ready, None] + np.arange(m)
+        target[edges.ravel()] = chosen[candidates][selected]
+        keep = ~ready
+        nodes, first_edge, draws, drawn, short = (
+            nodes[keep], first_edge[keep], draws[keep], drawn[keep], short[keep])
+        if short.any():
+            lengths = drawn.sum(axis=1)
+            extend = np.flatnonzero(short)
+            width = 2 * lengths[extend].max()
+            if width > draws.shape[1]:
+                draws = np.concatenate([
+                    draws, np.full((len(nodes), width - draws.shape[1]), np.nan)], axis=1)
+            # Short rows draw as many values again as they have
+            slots = np.arange(draws.shape[1])
+            fill = (slots >= lengths[extend, None]) & (slots < 2 * lengths[extend, None])
+            block = draws[extend]
+            block[fill] = rng.random(fill.sum())
+            draws[extend] = block
+        elif len(nodes) > 0:
+            # Drop columns past the end of every row
+            draws = draws[:, :drawn.sum(axis=1).max()]
+
+def preferential_attachment(N, m, rng=None):
+    """Barabasi-Albert preferential attachment graph.
+
+    Starts from a star on m + 1 nodes, as nx.barabasi_albert_graph(N, m).
+    Each later node attaches m edges to distinct earlier nodes chosen with
+    probability proportional to degree, by picking random endpoints of
+    earlier edges and redrawing repeated targets, as networkx does. Nodes
+    draw in chunks, all nodes of a chunk at once; a node's targets are fixed
+    once the targets of the earlier edges it picked are known.
+    """
+    if rng is None:
+        rng = nprand
+    if m < 1 or m >= N:
+        raise ValueError('Preferential attachment requires 1 <= m < N, got m = {}, N = {}'.format(m, N))
+    # Edge e joins source[e] to target[e]; the star comes first
+    num_edges = m + (N - m - 1) * m
+    source = np.concatenate([
+        np.zeros(m, dtype=np.int64),
+        np.repeat(np.arange(m + 1, N), m)])
+    target = np.full(num_edges, -1, dtype=np.int64)
+    target[:m] = np.arange(1, m + 1)
+    # Nodes depend only on earlier nodes. Chunks of about 1 / m times the
+    # number of earlier nodes depend little on themselves, so each is
+    # resolved in a few passes.
+    start = m + 1
+    while start < N:
+        stop = min(N, start + max(1, start // m))
+        _attach_chunk(np.arange(start, stop), m, source, target, rng)
+        start = stop
+    return edges_to_adjacency(source, target, N)
+
+def watts_strogatz(N, k, p, rng=None):
+    """Watts-Strogatz small-world graph, as nx.watts_strogatz_graph(N, k, p).
+
+    Each node is joined to its k // 2 nearest neighbors on each side of a
+    ring, then each edge (u, u + j) is rewired with probability p to
+    (u, w) for w chosen uniformly, avoiding self-loops and existing edges.
+    Rewired edges are drawn for all edges at once, redrawing collisions.
+    """
+    if rng is None:
+        rng = nprand
+    half = k // 2
+    u = np.repeat(np.arange(N), half)
+    v = (u + np.tile(np.arange(1, half + 1), N)) % N
+    rewire = np.flatnonzero(rng.random(len(u)) < p)
+    if half > 0 and N - 1 > 2 * half:
+        candidates = rewire
+        # Edges of nodes joined to almost every other node may never find a
+        # free target, leave them in place after enough attempts
+        for attempt in range(100):
+            if len(candidates) == 0:
+                break
+            w = (rng.random(len(candidates)) * N).astype(np.int64) % N
+            low = np.minimum(u[candidates], w)
+            high = np.maximum(u[candidates], w)
+            edge_keys = low * N + high
+            # As in networkx, an edge being rewired still blocks its own target
+            existing = np.sort(np.minimum(u, v) * N + np.maximum(u, v))
+            position = np.minimum(np.searchsorted(existing, edge_keys), len(existing) - 1)
+            # Only one of several candidates drawing the same edge keeps it
+            order = np.argsort(edge_keys, kind='stable')
+            first = np.ones(len(candidates), dtype=bool)
+            first[order[1:]] = edge_keys[order[1:]] != edge_keys[order[:-1]]
+            ok = (w != u[candidates]) & (existing[position] != edge_keys) & first
+            v[candidates[ok]] = w[ok]
+            candidates = candidates[~ok]
+    return edges_to_adjacency(u, v, N)
+
+def complete(N):
+    """Complete graph on N nodes."""
+    rows = np.repeat(np.arange(N), N)
+    cols = np.tile(np.arange(N), N)
+    keep = rows != cols
+    return Adjacency.from_edges(rows[keep], cols[keep], list(range(N)))
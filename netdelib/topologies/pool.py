@@ -0,0 +1,182 @@
+"""Pools of pre-generated graphs for slow static topologies.
+
+Some generators, such as nx.LFR_benchmark_graph, are slow and often fail to
+converge. A GraphPool generates a fixed number of graphs for one factory in
+parallel, retrying failures, and stores them as a compressed CSR file named
+by a hash of the factory parameters, pool size and seed. Later sweeps with
+the same parameters load the file instead of generating graphs again.
+
+Run i of a sweep uses graph i % size, through the factory returned by
+pool.factory(i), which hands out the same Adjacency at every stage. Each
+process reads a pool file once.
+
+Example
+    pool = GraphPool(factories.LFRFactory(N, M, 3, 1.5, 0.1), 20, 'pools', seed=1)
+    pool.generate()
+    result = run_discrete(pool.factory(run), ...)
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+
+import networkx as nx
+import numpy as np
+
+try:
+    from ..soclearn.adjacency import Adjacency
+    from ..soclearn.batch import seed_random
+except ImportError:
+    # Imported as the top-level package topologies, with netdelib/ on the path
+    from soclearn.adjacency import Adjacency
+    from soclearn.batch import seed_random
+from .factories import NetworkFactory
+
+# Errors raised by networkx generators that may succeed with another seed
+GENERATION_ERRORS = (nx.ExceededMaxIterations, nx.NetworkXError)
+
+# Adjacencies loaded by this process, by pool filename. Pools created again
+# for later trials share them instead of reading the file again.
+_loaded = {}
+
+def factory_key(factory, size, seed):
+    """Return a hex digest identifying a factory's parameters, pool size and seed."""
+    params = {
+        'factory': type(factory).__name__,
+        'params': vars(factory),
+        'size': size,
+        'seed': seed,
+    }
+    text = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _generate_graph(task):
+    factory, seed_sequence, retries = task
+    for child in seed_sequence.spawn(retries):
+        # networkx generators draw from the random module
+        seed_random(child)
+        try:
+            return factory.create_csr(0, np.random.default_rng(child))
+        except GENERATION_ERRORS:
+            continue
+    raise RuntimeError('Could not generate a {} graph in {} attempts'.format(
+        type(factory).__name__, retries))
+
+class GraphPool(object):
+    """A fixed set of graphs generated by a static factory.
+
+    Constructor parameters
+    factory: a NetworkFactory with stage_graphs False
+    size: number of graphs in the pool
+    path: directory holding pool files
+    seed: (optional) seed for generating the pool
+    retries: attempts per graph before giving up
+    """
+
+    def __init__(self, factory, size, path, seed=None, retries=10):
+        if factory.stage_graphs:
+            raise ValueError('Only factories with stage_graphs False can be pooled')
+        self.base = factory
+        self.size = size
+        self.path = path
+        self.seed = seed
+        self.retries = retries
+        self._graphs = None
+
+    @property
+    def key(self):
+        return factory_key(self.base, self.size, self.seed)
+
+    @property
+    def filename(self):
+        return os.path.join(self.path, self.key + '.npz')
+
+    def exists(self):
+        return os.path.exists(self.filename)
+
+    def generate(self, processes=None):
+        """Generate and store the pool, unless it is already stored.
+
+        Parameters
+        processes: number of worker processes, defaults to all cores.
+            With processes=1 graphs are generated in the current process.
+        """
+        if self.exists():
+            return
+        seeds = np.random.SeedSequence(self.seed).spawn(self.size)
+        tasks = [(self.base, seed, self.retries) for seed in seeds]
+        if processes == 1:
+            graphs = [_generate_graph(task) for task in tasks]
+        else:
+            with multiprocessing.Pool(processes) as pool:
+                graphs = pool.map(_generate_graph, tasks)
+        self.save(graphs)
+        self._graphs = _loaded[self.filename] = graphs
+
+    def save(self, graphs):
+        """Write a list of adjacencies to the pool file."""
+        os.makedirs(self.path, exist_ok=True)
+        offsets = np.cumsum([0] + [len(graph.indices) for graph in graphs])
+        # Write to a temporary file first, so concurrent readers never see
+        # a partial pool
+        partial = self.filename + '.partial.npz'
+        np.savez_compressed(
+            partial,
+            indptr=np.stack([graph.indptr for graph in graphs]),
+            indices=np.concatenate([graph.indices for graph in graphs]),
+            offsets=offsets)
+        os.replace(partial, self.filename)
+
+    def load(self):
+        """Return the list of pooled adjacencies.
+
+        The file is read once per process, pools with the same filename
+        share the loaded adjacencies.
+        """
+        if self._graphs is None:
+            self._graphs = _loaded.get(self.filename)
+        if self._graphs is None:
+            with np.load(self.filename) as data:
+                indptr = data['indptr']
+                indices = data['indices']
+                offsets = data['offsets']
+            nodes = list(range(self.base.N))
+            self._graphs = [
+                Adjacency(indptr[i], indices[offsets[i]:offsets[i + 1]], nodes)
+                for i in range(len(indptr))]
+            _loaded[self.filename] = self._graphs
+        return self._graphs
+
+    def get(self, run):
+        """Return the adjacency used by run."""
+        return self.load()[run % self.size]
+
+    def factory(self, run):
+        """Return a factory handing out the graph of run, see PooledFactory."""
+        return PooledFactory(self, run)
+
+class PooledFactory(NetworkFactory):
+    """Factory returning one pooled graph at every stage.
+
+    create_csr() and create_adjacency() return the same Adjacency object
+    each time, so it is never converted again. create() converts it to a
+    networkx Graph once.
+
+    Constructor parameters
+    pool: a GraphPool
+    run: index of the run, selecting graph run % pool.size
+    """
+
+    def __init__(self, pool, run):
+        super(PooledFactory, self).__init__(pool.base.N, pool.base.M, False)
+        self.pool = pool
+        self.run = run
+        self._graph = None
+
+    def create_csr(self, stage, rng=None):
+        return self.pool.get(self.run)
+
+    def create(self, stage):
+        if self._graph is None:
+            self._graph = self.create_csr(stage).to_graph()
+        return self._graph
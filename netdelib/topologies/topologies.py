@@ -1,62 +1,129 @@
+import functools
 import random
 
-def get_long_path_stage_groups(N, M, stage, lowest=2):
-    """Find groups for a particular stage using long-path network.
+import numpy as np
+
+LONG_PATH_MODULI = (
+    1, 2,  3,  5,  7, 11, 13, 17, 19, 23, 29,
+    31, 37, 41, 43, 47, 53, 59, 61, 67, 71,
+    73, 79, 83, 89, 97,101,103,107,109,113,
+    127,131,137,139,149,151,157,163,167,173,
+    179,181,191,193,197,199,211,223,227,229,
+    233,239,241,251,257,263,269,271,277,281,
+    283,293,307,311,313,317,331,337,347,349,
+    353,359,367,373,379,383,389,397,401,409,
+    419,421,431,433,439,443,449,457,461,463,
+    467,479,487,491,499,503,509,521,523,541,
+    547,557,563,569,571,577,587,593,599,601,
+    607,613,617,619,631,641,643,647,653,659,
+    661,673,677,683,691,701,709,719,727,733,
+    739,743,751,757,761,769,773,787,797,809,
+    811,821,823,827,829,839,853,857,859,863,
+    877,881,883,887,907,911,919,929,937,941,
+    947,953,967,971,977,983,991,997,1009,1013 
+)
+
+@functools.lru_cache(maxsize=None)
+def get_long_path_moduli(N, M, lowest=2):
+    """Find the modulus used at each stage of a long-path network.
     
     # Params
     N: Number of participants (integer, must be > 0).
     M: Group size (integer, must be >= 2).
-    stage: Stage of deliberation (integer, must be >= 0).
     lowest: Begin with the first modulus >= lowest.
     
     # Returns
-    A list, with each element a set of participant ids corresponding to a group.
-    Participants are given integer ids in [0, N-1].
+    A tuple of moduli, stage i uses element i % len(moduli).
     
     """
-    modulus = [
-        1, 2,  3,  5,  7, 11, 13, 17, 19, 23, 29,
-        31, 37, 41, 43, 47, 53, 59, 61, 67, 71,
-        73, 79, 83, 89, 97,101,103,107,109,113,
-        127,131,137,139,149,151,157,163,167,173,
-        179,181,191,193,197,199,211,223,227,229,
-        233,239,241,251,257,263,269,271,277,281,
-        283,293,307,311,313,317,331,337,347,349,
-        353,359,367,373,379,383,389,397,401,409,
-        419,421,431,433,439,443,449,457,461,463,
-        467,479,487,491,499,503,509,521,523,541,
-        547,557,563,569,571,577,587,593,599,601,
-        607,613,617,619,631,641,643,647,653,659,
-        661,673,677,683,691,701,709,719,727,733,
-        739,743,751,757,761,769,773,787,797,809,
-        811,821,823,827,829,839,853,857,859,863,
-        877,881,883,887,907,911,919,929,937,941,
-        947,953,967,971,977,983,991,997,1009,1013 
-    ]
+    modulus = LONG_PATH_MODULI
     
     # Remove excluded moduli
     if lowest is not None and lowest > 1:
-        modulus = [1] + [x for x in modulus if x >= lowest]
+        modulus = (1,) + tuple(x for x in modulus if x >= lowest)
     
     # If stage is too high, modulus sets will be smaller than M
     # Correct for the above by resetting stage after an upper limit
     num_groups = int(N / M)
     num_moduli = [i for i, m in enumerate(modulus) if m > num_groups][0]
-    stage = stage % num_moduli
-    
-    if stage == 0:
-        m = 1
-    else:
-        m = modulus[stage]
-    partition = []
-    for j in range(m):
-        # Generate 
-        residue_class = [n for n in range(N) if n % m == j]
-        chunks = [
-            set(residue_class[k:k+M]) 
-            for k in range(0, len(residue_class), M)]
-        partition += chunks
-    return partition
+    return modulus[:num_moduli]
+
+@functools.lru_cache(maxsize=None)
+def _long_path_modulus_ids(N, M, m):
+    # Participant n is element n // m of residue class n % m, which is split
+    # into chunks of M. Classes are numbered in order of residue.
+    n = np.arange(N)
+    residue = n % m
+    class_sizes = N // m + (np.arange(m) < N % m)
+    class_groups = -(-class_sizes // M)
+    offsets = np.cumsum(class_groups) - class_groups
+    ids = offsets[residue] + (n // m) // M
+    ids.setflags(write=False)
+    return ids
+
+def get_long_path_stage_group_ids(N, M, stage, lowest=2):
+    """Find group membership for a particular stage using long-path network.
+    
+    # Params
+    N: Number of participants (integer, must be > 0).
+    M: Group size (integer, must be >= 2).
+    stage: Stage of deliberation (integer, must be >= 0).
+    lowest: Begin with the first modulus >= lowest.
+    
+    # Returns
+    A read-only array of N group ids, the groups of get_long_path_stage_groups().
+    
+    """
+    moduli = get_long_path_moduli(N, M, lowest)
+    return _long_path_modulus_ids(N, M, moduli[stage % len(moduli)])
+
+def get_long_path_group_ids(N, M, D, lowest=2):
+    """Find group membership for all stages using long-path network.
+    
+    # Params
+    N: Number of participants (integer, must be > 0).
+    M: Group size (integer, must be >= 2).
+    D: Number of stages (integer, must be > 0).
+    lowest: Begin with the first modulus >= lowest.
+    
+    # Returns
+    A D x N array, row i as returned by get_long_path_stage_group_ids().
+    
+    """
+    ids = np.empty((D, N), dtype=np.int64)
+    for i in range(D):
+        ids[i] = get_long_path_stage_group_ids(N, M, i, lowest)
+    return ids
+
+def ids_to_groups(ids):
+    """Convert an array of group ids to a list of groups.
+    
+    # Params
+    ids: An array of N group ids, as returned by get_*_stage_group_ids().
+    
+    # Returns
+    A list of sets of participant ids, ordered by group id.
+    
+    """
+    order = np.argsort(ids, kind='stable')
+    bounds = np.flatnonzero(np.diff(ids[order])) + 1
+    return [set(group.tolist()) for group in np.split(order, bounds)]
+
+def get_long_path_stage_groups(N, M, stage, lowest=2):
+    """Find groups for a particular stage using long-path network.
+    
+    # Params
+    N: Number of participants (integer, must be > 0).
+    M: Group size (integer, must be >= 2).
+    stage: Stage of deliberation (integer, must be >= 0).
+    lowest: Begin with the first modulus >= lowest.
+    
+    # Returns
+    A list, with each element a set of participant ids corresponding to a group.
+    Participants are given integer ids in [0, N-1].
+    
+    """
+    return ids_to_groups(get_long_path_stage_group_ids(N, M, stage, lowest))
 
 def get_long_path_stages(N, M, D):
     """Find groups all stages using long-path network.
@@ -71,11 +138,7 @@ def get_long_path_stages(N, M, D):
     Each element is a list as returned by get_long_path_stage_groups().
     
     """
-    stages = []
-    for i in range(D):
-        groups = get_long_path_stage_groups(N, M, i)
-        stages.append(groups)
-    return stages
+    return [ids_to_groups(ids) for ids in get_long_path_group_ids(N, M, D)]
 
 def get_random_stage_groups(N, M, i):
     """Find groups for a particular stage using random network.
@@ -95,6 +158,24 @@ def get_random_stage_groups(N, M, i):
     groups = [set(nodes[k:k+M]) for k in range(0, N, M)]
     return groups
 
+def get_random_stage_group_ids(N, M, i):
+    """Find group membership for a particular stage using random network.
+    
+    # Params
+    N: Number of participants (integer, must be > 0).
+    M: Group size (integer, must be >= 2).
+    stage: Stage of deliberation (integer, must be >= 0).
+    
+    # Returns
+    An array of N group ids, the groups of get_random_stage_groups().
+    
+    """
+    nodes = list(range(N))
+    random.shuffle(nodes)
+    ids = np.empty(N, dtype=np.int64)
+    ids[nodes] = np.arange(N) // M
+    return ids
+
 def get_random_groups(N, M, D):
     """Find groups all stages using long-path network.
     